@@ -0,0 +1,25 @@
+import pandas as pd
+
+
+def grouped_slices(df, outer, inner, measures):
+    """Sum `measures` per (outer, inner) in one groupby and split by outer.
+
+    Returns {outer value: frame indexed by inner}, so a chart per country (or
+    any outer key) reuses one aggregation instead of filtering the table once
+    per chart.
+    """
+    totals = df.groupby([outer, inner], observed=True)[measures].sum()
+    return {key: part.droplevel(0) for key, part in totals.groupby(level=0, observed=True)}
+
+
+def breakdown(df, column, measure):
+    """Total, percentage share and display value of `measure` per `column` value.
+
+    One grouped pass over whatever categories are present, so new categories
+    show up without code changes.
+    """
+    totals = df.groupby(column, observed=True)[measure].sum()
+    result = pd.DataFrame({"total": totals})
+    result["share"] = 100 * totals / totals.sum()
+    result["absolute"] = totals.round().astype("int64")
+    return result
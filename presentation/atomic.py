@@ -0,0 +1,20 @@
+import os
+import tempfile
+
+
+def atomic_write(path, write, mode="wb"):
+    """Call write(file) on a private temp file next to `path`, then rename it over `path`.
+
+    Every writer gets its own temp file in the target directory, so
+    concurrent writers never interleave and readers only ever see a complete
+    file. The temp file is removed when write() fails.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".",
+                               suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
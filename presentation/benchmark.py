@@ -0,0 +1,200 @@
+"""Time ingestion, cleaning, aggregation and rendering on synthetic sales data.
+
+    python benchmark.py [--sizes 10000 100000 ...] [--output FILE] [--compare OLD]
+
+Every (rows, stage) measurement is appended to FILE as one JSON line with the
+commit it ran on, so runs from different commits can be compared with
+--compare.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from aggregations import grouped_slices
+from cleaning import clean_sales
+from cube import build_cube, rollup
+from downsample import downsample
+from figure_cache import figure_bytes, subplots
+from loader import DATA_PATH, ENGINE
+from schema import read_sales_csv
+from streaming import aggregate_csv
+from timeseries import resample
+
+SIZES = [10 ** 4, 10 ** 5, 10 ** 6]
+OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_results.jsonl")
+# "streaming" is the out-of-core path: chunked read, clean and aggregate in one pass
+STAGES = ["ingestion", "preprocessing", "aggregation", "rendering", "streaming"]
+
+# rows generated and written per step, so 10**8 rows never sit in memory at once
+CHUNK = 1_000_000
+
+FIRST_DAY = pd.Timestamp("2015-01-01")
+DAYS = 578
+# share of rows with the mostly empty Column1 filled, as in the real csv
+COLUMN1_FILLED = 0.07
+
+
+def synthetic_chunks(rows, seed=0, template=DATA_PATH):
+    """Frames in the csv's layout with its mix of values, CHUNK rows at a time.
+
+    Locations, products (with their unit prices) and customers are drawn from
+    the real rows independently; dates, quantities and the derived amounts
+    are generated.
+    """
+    rng = np.random.default_rng(seed)
+    real = read_sales_csv(template).dropna(subset=["Country", "Sub Category", "Customer Age"])
+    locations = real[["Country", "State"]].reset_index(drop=True)
+    products = real[["Product Category", "Sub Category", "Unit Cost", "Unit Price"]].reset_index(drop=True)
+    customers = real[["Customer Age", "Customer Gender"]].reset_index(drop=True)
+    start = 0
+    while start < rows:
+        n = min(CHUNK, rows - start)
+        dates = FIRST_DAY + pd.to_timedelta(rng.integers(0, DAYS, n), unit="D")
+        quantity = rng.integers(1, 4, n)
+        chunk = pd.concat([
+            customers.iloc[rng.integers(0, len(customers), n)].reset_index(drop=True),
+            locations.iloc[rng.integers(0, len(locations), n)].reset_index(drop=True),
+            products.iloc[rng.integers(0, len(products), n)].reset_index(drop=True),
+        ], axis=1)
+        chunk.insert(0, "index", np.arange(start, start + n))
+        chunk.insert(1, "Date", dates.strftime("%m/%d/%Y"))
+        chunk.insert(2, "Year", dates.year)
+        chunk.insert(3, "Month", dates.month_name())
+        chunk.insert(10, "Quantity", quantity)
+        chunk["Cost"] = (quantity * chunk["Unit Cost"]).round()
+        chunk["Revenue"] = (quantity * chunk["Unit Price"] * rng.uniform(0.8, 1.2, n)).round()
+        chunk["Column1"] = chunk["Revenue"].where(rng.random(n) < COLUMN1_FILLED)
+        yield chunk
+        start += n
+
+
+def write_synthetic(path, rows, seed=0):
+    for i, chunk in enumerate(synthetic_chunks(rows, seed)):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    return path
+
+
+def _reset_peak():
+    """Start a new peak-RSS window; False where the OS cannot do that."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_bytes():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # process-wide peak so far, kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(run, *args):
+    """(result, seconds, peak resident bytes) of run(*args)."""
+    _reset_peak()
+    start = time.perf_counter()
+    result = run(*args)
+    return result, time.perf_counter() - start, _peak_bytes()
+
+
+def aggregate(df):
+    cube = build_cube(df)
+    return {
+        "cube": cube,
+        "country_quantity": rollup(cube, "Country", "Quantity"),
+        "state_totals": grouped_slices(cube, "Country", "State", ["Quantity", "profit"]),
+        "daily_revenue": resample(df, "Revenue", "day"),
+    }
+
+
+def render(aggregates):
+    fig, ax = subplots(figsize=(14, 7))
+    totals = aggregates["country_quantity"]
+    ax.bar(totals.index, totals.values)
+    sizes = [len(figure_bytes(fig))]
+    revenue = downsample(aggregates["daily_revenue"]["sum"])
+    fig, ax = subplots(figsize=(15, 4))
+    ax.plot(revenue.index, revenue.values)
+    sizes.append(len(figure_bytes(fig)))
+    return sizes
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(rows, workdir, seed=0):
+    """One record per stage for a synthetic table of `rows` rows."""
+    path = os.path.join(workdir, f"sales_{rows}.csv")
+    write_synthetic(path, rows, seed)
+    raw, *ingestion = measure(read_sales_csv, path, ENGINE)
+    clean, *preprocessing = measure(clean_sales, raw)
+    raw = None
+    aggregates, *aggregation = measure(aggregate, clean)
+    _, *rendering = measure(render, aggregates)
+    clean = aggregates = None
+    _, *streaming = measure(aggregate_csv, path)
+    os.remove(path)
+    return [{"stage": stage, "rows": rows, "seconds": seconds, "peak_bytes": peak}
+            for stage, (seconds, peak) in zip(STAGES, [ingestion, preprocessing, aggregation, rendering, streaming])]
+
+
+def compare(old_path, new_path, threshold=1.2):
+    """Print stages whose time grew by more than `threshold` between two result files."""
+    def latest(path):
+        with open(path) as f:
+            return {(r["rows"], r["stage"]): r for r in map(json.loads, f)}
+
+    old, new = latest(old_path), latest(new_path)
+    for key in sorted(set(old) & set(new)):
+        ratio = new[key]["seconds"] / max(old[key]["seconds"], 1e-9)
+        flag = "  <-- slower" if ratio > threshold else ""
+        print(f"{key[0]:>11,} {key[1]:<14} {old[key]['seconds']:8.3f}s -> {new[key]['seconds']:8.3f}s "
+              f"({ratio:.2f}x){flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--output", default=OUTPUT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", metavar="OLD", help="compare --output against an earlier result file")
+    args = parser.parse_args(argv)
+
+    context = {"commit": _commit(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+               "python": platform.python_version(), "pandas": pd.__version__, "engine": ENGINE}
+    with tempfile.TemporaryDirectory() as workdir, open(args.output, "a") as out:
+        for rows in args.sizes:
+            for record in run_size(rows, workdir, args.seed):
+                record.update(context)
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                print(f"{rows:>11,} {record['stage']:<14} {record['seconds']:8.3f}s "
+                      f"{record['peak_bytes'] / 2 ** 20:8.1f} MiB peak")
+    if args.compare:
+        compare(args.compare, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Chart builders of the visualization page.
+
+Each one takes the small aggregates it draws (counts, rollups, resampled
+series, panel dicts) and returns a figure, so render_pool can run it in a
+worker process and only ship the inputs and the image bytes across.
+"""
+import matplotlib.pyplot as plt
+
+from facets import small_multiples
+from figure_cache import subplots
+
+
+def month_pie(month_counts):
+    fig, ax = subplots()
+    ax.pie(month_counts, labels=month_counts.index, autopct='%1.1f%%', startangle=90, shadow=True)
+    ax.axis('equal')
+    return fig
+
+
+def revenue_over_year(revenue, year):
+    fig, ax = subplots(figsize=(15, 4))
+    ax.plot(revenue.index, revenue.values)
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Revenue")
+    ax.set_title(f"Revenue Over {year}")
+    return fig
+
+
+def profit_over_time(profit_mean):
+    fig, ax = subplots(figsize=(20, 5))
+    ax.plot(profit_mean.index, profit_mean.values)
+    ax.set_title("Profit Over Time")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Profit")
+    ax.tick_params(axis="x", rotation=45)
+    fig.tight_layout()
+    return fig
+
+
+def month_grid(year_panels, year):
+    return small_multiples(year_panels, ncols=4, title=f"Revenue over Months in {year}",
+                           panel_title=f"Revenue in {{}}/{year}")
+
+
+def age_pairplot(ages):
+    # figure-level seaborn plot: needs pyplot, which is fine in a worker's main thread
+    import seaborn as sns
+
+    grid = sns.pairplot(ages, vars=["Customer Age"], height=3)
+    plt.tight_layout()
+    return grid.figure
+
+
+def gender_count(counts):
+    fig, ax = subplots()
+    ax.bar(counts["Customer Gender"], counts["Count"], color=["skyblue", "lightgreen"])
+    ax.set_xlabel("Gender")
+    ax.set_ylabel("Count")
+    ax.set_title("Gender Count")
+    fig.tight_layout()
+    return fig
+
+
+def totals_bar(totals, xlabel, ylabel, title, figsize=(14, 7), color='skyblue', rotation=90, ylim=None):
+    """One bar per index value of `totals`."""
+    fig, ax = subplots(figsize=figsize)
+    ax.bar(totals.index, totals.values, color=color)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.tick_params(axis="x", rotation=rotation)
+    fig.tight_layout()
+    if ylim is not None:
+        ax.set_ylim(*ylim)
+    return fig
+
+
+def state_grid(states, measure, ylabel, title, color, figsize):
+    """2x2 bars of `measure` per state, one panel per country in `states`."""
+    fig, axes = subplots(2, 2, figsize=figsize)
+    axes = axes.flatten()
+
+    for ax, (country, totals) in zip(axes, states.items()):
+        totals = totals.reset_index()
+        ax.bar(totals["State"], totals[measure], color=color)
+        ax.set_xlabel(f"Sales in {country}")
+        ax.set_ylabel(ylabel)
+        ax.set_title(title.format(country))
+        ax.tick_params(axis='x', rotation=85)
+        for j, v in enumerate(totals[measure]):
+            ax.text(j, v + 0.1, str(int(v)), ha='center', va='bottom', fontsize=7)
+    for ax in axes[len(states):]:
+        ax.set_visible(False)
+    fig.tight_layout()
+    return fig
+
+
+def share_pie(totals, labels, title, absolute=None):
+    """Pie of `totals`; the wedge labels show `absolute` instead of percentages when given."""
+    fig, ax = subplots()
+    _, _, autotexts = ax.pie(totals, labels=labels, autopct="%1.1f%%", startangle=140)
+    if absolute is not None:
+        for text, value in zip(autotexts, absolute):
+            text.set_text(f"{value}")
+    ax.set_title(title)
+    ax.axis('equal')
+    fig.tight_layout()
+    return fig
+
+
+def subcategory_grid(totals, products, measure):
+    """Bars of `measure` per Sub Category, one panel per Product Category."""
+    fig, axes = subplots(1, 3, figsize=(12, 5))
+    axes = axes.flatten()
+
+    for ax, product in zip(axes, products):
+        product_totals = totals[totals["Product Category"] == product][["Sub Category", measure]]
+        ax.bar(product_totals["Sub Category"], product_totals[measure])
+        ax.set_xlabel(f"{product} Sub Categories")
+        ax.set_ylabel(measure.capitalize())
+        ax.set_title(f"{measure.capitalize()} in {product}")
+        ax.set_xticks(range(len(product_totals["Sub Category"])))
+        ax.set_xticklabels(product_totals["Sub Category"], rotation=85, fontsize=7)
+
+        for j, v in enumerate(product_totals[measure]):
+            ax.text(j, v + 1, str(int(v)), ha="center", va="bottom", fontsize=6)
+
+    fig.tight_layout()
+    return fig
+
+
+def purchase_counts(counts, x, hue, title, figsize, rotation):
+    """Grouped bars of purchase counts per `x`, one bar per `hue` value."""
+    import seaborn as sns
+
+    fig, ax = subplots(figsize=figsize)
+    sns.barplot(data=counts, x=x, y='count', hue=hue, ax=ax)
+    ax.set_title(title)
+    ax.set_xlabel(x)
+    ax.set_ylabel('Number of Purchases')
+    ax.tick_params(axis="x", rotation=rotation)
+    fig.tight_layout()
+    return fig
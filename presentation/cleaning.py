@@ -0,0 +1,113 @@
+import threading
+
+import pandas as pd
+
+from dedup import RowFingerprints
+from schema import CATEGORY_COLUMNS, downcast
+
+DROP_COLUMNS = ["index", "Column1", "Year"]
+
+ORDER = ["Date", "day", "month", "Month", "year", "Customer Age", "Customer Gender",
+         "Country", "State", "Product Category", "Sub Category", "Quantity",
+         "Unit Cost", "Unit Price", "Cost", "Revenue"]
+
+
+def dedupe(df):
+    return df[~RowFingerprints(df).duplicated]
+
+
+def dropna(df):
+    # Column1 is almost entirely empty and gets dropped next, so it must not
+    # decide which rows survive
+    return df.dropna(axis=0, subset=[col for col in df.columns if col not in DROP_COLUMNS])
+
+
+def drop_columns(df):
+    return df.drop(columns=DROP_COLUMNS)
+
+
+def parse_dates(df):
+    df = df.copy(deep=False)
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df.sort_values(by="Date").reset_index(drop=True)
+
+
+def derive_date_parts(df):
+    df = df.copy(deep=False)
+    df["year"] = df["Date"].dt.year
+    df["month"] = df["Date"].dt.month
+    df["day"] = df["Date"].dt.day
+    return df
+
+
+def reorder(df):
+    return df[ORDER]
+
+
+def derive_profit(df):
+    df = df.copy(deep=False)
+    df["profit"] = df["Revenue"] - df["Cost"]
+    return df
+
+
+def compact(df):
+    df = df.copy(deep=False)
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+    return downcast(df)
+
+
+class Pipeline:
+    """Named cleaning steps whose intermediate outputs are kept per input.
+
+    output(df, key, step) returns the table after `step`, reusing the latest
+    cached step before it, so asking for every stage in turn runs each step
+    once. `key` identifies the input (e.g. the csv fingerprint).
+    """
+
+    def __init__(self, steps):
+        self.steps = steps
+        self.names = [name for name, _ in steps]
+        self._key = None
+        self._outputs = {}
+        self._lock = threading.Lock()
+
+    def output(self, df, key, step=None):
+        last = self.names.index(step) if step is not None else len(self.steps) - 1
+        with self._lock:
+            if key != self._key:
+                self._key = key
+                self._outputs = {}
+            start = -1
+            for i in range(last, -1, -1):
+                if i in self._outputs:
+                    start = i
+                    df = self._outputs[i]
+                    break
+            for i in range(start + 1, last + 1):
+                df = self.steps[i][1](df)
+                self._outputs[i] = df
+        return df.copy(deep=False)
+
+    def run(self, df):
+        """All steps without caching, e.g. for a batch seen only once."""
+        for _, step in self.steps:
+            df = step(df)
+        return df
+
+
+SALES_PIPELINE = Pipeline([
+    ("dedupe", dedupe),
+    ("dropna", dropna),
+    ("drop_columns", drop_columns),
+    ("parse_dates", parse_dates),
+    ("derive_date_parts", derive_date_parts),
+    ("reorder", reorder),
+    ("derive_profit", derive_profit),
+    ("compact", compact),
+])
+
+
+def clean_sales(df):
+    """The pre_processing page steps in one go, returning the table every chart uses."""
+    return SALES_PIPELINE.run(df)
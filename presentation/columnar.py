@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from schema import downcast
+
+
+def _code_dtype(size):
+    """Narrowest signed integer able to hold codes 0..size-1 and -1 for missing."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if size <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _read_only(array):
+    array = np.asarray(array)
+    if array.flags.writeable:
+        array.flags.writeable = False
+    return array
+
+
+class ColumnStore:
+    """A table kept as read-only arrays shared by every session of the process.
+
+    Categorical columns are an int8/int16 code array plus a small dictionary;
+    numeric columns are narrowed to the smallest lossless width. frame()
+    wraps the arrays in a pandas DataFrame without copying them, so sessions
+    only pay for the frame objects, and the arrays cannot be written to.
+    """
+
+    def __init__(self, columns, codes, dictionaries, arrays):
+        self.columns = list(columns)
+        self.codes = {col: _read_only(array) for col, array in codes.items()}
+        self.dictionaries = dictionaries
+        self.arrays = {col: _read_only(array) for col, array in arrays.items()}
+        self._frame = pd.DataFrame({col: self._column(col) for col in self.columns}, copy=False)
+
+    @classmethod
+    def from_frame(cls, df):
+        df = downcast(df)
+        codes, dictionaries, arrays = {}, {}, {}
+        for col in df.columns:
+            values = df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                dictionaries[col] = values.dtype
+                size = len(values.cat.categories)
+                codes[col] = values.cat.codes.to_numpy().astype(_code_dtype(size), copy=False)
+            else:
+                arrays[col] = values.to_numpy()
+        return cls(df.columns, codes, dictionaries, arrays)
+
+    def __len__(self):
+        column = self.columns[0]
+        return len(self.codes[column] if column in self.codes else self.arrays[column])
+
+    @property
+    def nbytes(self):
+        codes = sum(array.nbytes for array in self.codes.values())
+        dictionaries = sum(dtype.categories.memory_usage(deep=True) for dtype in self.dictionaries.values())
+        return codes + dictionaries + sum(array.nbytes for array in self.arrays.values())
+
+    def _column(self, col):
+        if col in self.codes:
+            categorical = pd.Categorical.from_codes(self.codes[col], dtype=self.dictionaries[col], validate=False)
+            return pd.Series(categorical, name=col, copy=False)
+        return pd.Series(self.arrays[col], name=col, copy=False)
+
+    def frame(self, columns=None):
+        """A DataFrame over the stored arrays, optionally only some columns.
+
+        Frames are copy-on-write views of one base frame: adding or replacing
+        columns is free, and writing into a column copies just that column.
+        """
+        if columns is None:
+            return self._frame.copy(deep=False)
+        return self._frame[columns]
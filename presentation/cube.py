@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from loader import DATA_PATH
+from parallel import grouped_sums, workers_for
+from store import CLEAN_PATH, dataset_key, files_since, load_clean, read_table, write_feather
+from versioned import VersionCache
+
+DIMENSIONS = ["Country", "State", "Product Category", "Sub Category", "year", "month"]
+MEASURES = ["Quantity", "Revenue", "Cost", "profit"]
+
+# cubes of filtered views, least recently used evicted first
+MAX_FILTERED = 16
+
+_cubes = VersionCache()
+_filtered = OrderedDict()
+_filtered_lock = threading.Lock()
+
+
+def build_cube(df):
+    """Sum every measure and count rows for each observed dimension combination."""
+    if workers_for(len(df)) > 1:
+        return grouped_sums(df, DIMENSIONS, MEASURES)
+    aggs = {measure: (measure, "sum") for measure in MEASURES}
+    aggs["count"] = ("Quantity", "size")
+    return df.groupby(DIMENSIONS, observed=True).agg(**aggs).reset_index()
+
+
+def rollup(cube, by, measure, where=None):
+    """Re-aggregate the cube to `by`, optionally restricted to dimension values.
+
+    `where` maps a dimension to a single value, e.g. {"Country": "France"}.
+    """
+    if where:
+        for dim, value in where.items():
+            cube = cube[cube[dim] == value]
+    # a filtered cube keeps every category; charts should only lay out the ones present
+    columns = [by] if isinstance(by, str) else by
+    cube = cube.assign(**{dim: cube[dim].cat.remove_unused_categories() for dim in columns
+                          if isinstance(cube[dim].dtype, pd.CategoricalDtype)})
+    return cube.groupby(by, observed=True)[measure].sum()
+
+
+def cube_path(path):
+    """Where the cube of a feather file (the base table or one segment) is kept."""
+    return path[: -len(".feather")] + ".cube.feather"
+
+
+def save_cube(path, cube, key):
+    """Write a cube with the file key it was computed for, see store.files_since()."""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(cube, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b"key"] = json.dumps(key).encode()
+    write_feather(table.replace_schema_metadata(metadata), path)
+
+
+def load_saved_cube(path, key):
+    """Cube saved for `key`, or None when missing or stale."""
+    import pyarrow as pa
+
+    if not os.path.exists(path):
+        return None
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    if (table.schema.metadata or {}).get(b"key") != json.dumps(key).encode():
+        return None
+    return table.to_pandas()
+
+
+def _file_cube(path, key):
+    cube = load_saved_cube(cube_path(path), key)
+    if cube is None:
+        cube = build_cube(read_table(path))
+        save_cube(cube_path(path), cube, key)
+    return cube
+
+
+def load_cube(source=DATA_PATH, target=CLEAN_PATH):
+    """Return (cube, hit), rebuilt only when the cleaned table changes.
+
+    Cubes are saved next to the base table and every segment, so a process
+    merges those instead of scanning the rows, and one already holding an
+    older version only merges in the segments appended since.
+    """
+    key = dataset_key(source, target)
+
+    def build():
+        try:
+            cube, files = files_since(_cubes.items(), key, source, target)
+        except ImportError:
+            df, _ = load_clean(source, target)
+            return build_cube(df)
+        parts = [_file_cube(path, file_key) for path, file_key in files]
+        if cube is not None:
+            parts.insert(0, cube)
+        return merge_cubes(*parts) if len(parts) > 1 else parts[0]
+
+    return _cubes.get(key, build)
+
+
+def filtered_cube(key, df):
+    """Cube of the filtered rows `df`, kept under `key` in a small LRU.
+
+    Pass (dataset_key(), selection_key(selection), dates) as the key, so
+    reruns with the same filters reuse the cube instead of regrouping.
+    """
+    with _filtered_lock:
+        cube = _filtered.get(key)
+        if cube is None:
+            cube = build_cube(df)
+            _filtered[key] = cube
+            while len(_filtered) > MAX_FILTERED:
+                _filtered.popitem(last=False)
+        else:
+            _filtered.move_to_end(key)
+    return cube
+
+
+def merge_cubes(*cubes):
+    """Combine cubes; cost depends on cube sizes, not on the rows behind them."""
+    combined = pd.concat(cubes, ignore_index=True)
+    for dim in DIMENSIONS:
+        # categoricals with different categories concat to plain strings
+        if not pd.api.types.is_numeric_dtype(combined[dim]):
+            combined[dim] = combined[dim].astype("category")
+    return combined.groupby(DIMENSIONS, observed=True)[MEASURES + ["count"]].sum().reset_index()
+
+
+def save_batch(segment, batch):
+    """Save the cube of the rows appended as `segment`, for every process to merge in."""
+    save_cube(cube_path(segment), build_cube(batch), os.path.basename(segment))
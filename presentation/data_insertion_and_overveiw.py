@@ -1,25 +1,47 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import datetime as dt
-from sklearn.preprocessing import OneHotEncoder,LabelEncoder, OrdinalEncoder
 import streamlit as st 
-import io
+import math
+
+from loader import DATA_PATH, ENGINE, fingerprint, load_sales
+from paging import PAGE_SIZES, page, query
+from profiling import describe, load_profile
+from schema import CATEGORY_COLUMNS, memory_report
 
-st.title("DATA")
 """# date insertion"""
 
 def data_insertion():
-    df=pd.read_csv('sales_for_course.csv')
+    df, hit = load_sales()
     return df
-df=data_insertion()
+
+
+def show_table(df, data_key):
+    """One page of `df` at a time, sorted and filtered on the server."""
+    col1, col2, col3, col4, col5 = st.columns(5)
+    sort = col1.selectbox("sort by", ["(none)"] + list(df.columns))
+    ascending = col2.selectbox("order", ["ascending", "descending"]) == "ascending"
+    filter_column = col3.selectbox("filter on", ["(none)"] + [col for col in CATEGORY_COLUMNS if col in df.columns])
+    where = {}
+    if filter_column != "(none)":
+        where[filter_column] = col4.selectbox("equal to", list(df[filter_column].cat.categories))
+    size = col5.selectbox("rows per page", PAGE_SIZES)
+
+    positions = query(df, data_key, None if sort == "(none)" else sort, ascending, where)
+    total = len(df) if positions is None else len(positions)
+    pages = max(1, math.ceil(total / size))
+    # a new query starts again from its first page
+    number = st.number_input(f"page (of {pages})", min_value=1, max_value=pages, value=1,
+                             key=f"page-{sort}-{ascending}-{where}-{size}")
+    st.dataframe(page(df, positions, number, size))
+    first = (number - 1) * size
+    st.caption(f"rows {min(first + 1, total):,}–{min(first + size, total):,} of {total:,}")
 
 
 def show():
+    st.title("DATA")
+    df, hit = load_sales()
     st.header("data_insertion_and_overveiw")
+    st.caption("dataset served from cache" if hit else "dataset parsed from csv")
     st.subheader("show data before start")
-    st.dataframe(df)
+    show_table(df, fingerprint())
     """# over veiw"""
 
     col1, col2 = st.columns([1, 5])
@@ -29,10 +51,9 @@ def show():
         st.write("view general information about data")
 
     if show_info:
-        buffer = io.StringIO()
-        df.info(buf=buffer)
-        s = buffer.getvalue()
-        st.text(s)
+        profile, profile_hit = load_profile()
+        st.caption("profile served from cache" if profile_hit else "profile computed from csv")
+        st.dataframe(profile[["dtype", "non-null", "nulls", "distinct"]].astype({"dtype": "str"}))
 
     st.markdown("---")  
 
@@ -43,7 +64,20 @@ def show():
         st.write("View meta statistics")
 
     if show_stats:
-        st.write(df.describe())
+        profile, profile_hit = load_profile()
+        st.caption("profile served from cache" if profile_hit else "profile computed from csv")
+        st.write(describe(profile))
+
+    st.markdown("---")
+
+    col5, col6 = st.columns([1, 5])
+    with col5:
+        show_memory = st.button("memory")
+    with col6:
+        st.write("compare memory of inferred dtypes with the declared schema")
+
+    if show_memory:
+        st.dataframe(memory_report(DATA_PATH, ENGINE))
 
 
         
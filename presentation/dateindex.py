@@ -0,0 +1,44 @@
+import numpy as np
+
+from loader import DATA_PATH
+from store import dataset_key, load_clean
+from versioned import VersionCache
+
+_indexes = VersionCache()
+
+
+class DateIndex:
+    """Row offsets of a table sorted by date.
+
+    A date range is two binary searches giving (start, stop), and rows()
+    turns that into a positional slice, a view of the table rather than a
+    copy.
+    """
+
+    def __init__(self, dates):
+        self.dates = np.asarray(dates)
+        if len(self.dates) and (self.dates[1:] < self.dates[:-1]).any():
+            raise ValueError("dates must be sorted")
+
+    def __len__(self):
+        return len(self.dates)
+
+    def bounds(self):
+        return self.dates[0], self.dates[-1]
+
+    def between(self, first=None, last=None):
+        """(start, stop) of the rows dated first..last inclusive; None leaves a side open."""
+        start = 0 if first is None else np.searchsorted(self.dates, np.asarray(first, dtype=self.dates.dtype), side="left")
+        stop = len(self.dates) if last is None else np.searchsorted(self.dates, np.asarray(last, dtype=self.dates.dtype), side="right")
+        return int(start), int(max(start, stop))
+
+
+def rows(df, bounds):
+    """The rows of `df` within (start, stop) offsets from a DateIndex."""
+    start, stop = bounds
+    return df.iloc[start:stop]
+
+
+def load_date_index(source=DATA_PATH):
+    """Return (DateIndex of the cleaned table, hit), built once per dataset version."""
+    return _indexes.get(dataset_key(source), lambda: DateIndex(load_clean(source)[0]["Date"].to_numpy()))
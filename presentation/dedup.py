@@ -0,0 +1,129 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from atomic import atomic_write
+
+
+def row_hashes(df, columns=None):
+    """One uint64 fingerprint per row.
+
+    Numeric columns are hashed as float64 so the same row hashes the same no
+    matter which integer width downcasting picked for its table.
+    """
+    frame = df[columns] if columns is not None else df
+    normalized = pd.DataFrame({
+        col: frame[col].astype("float64") if pd.api.types.is_numeric_dtype(frame[col]) else frame[col]
+        for col in frame.columns
+    })
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+
+class RowFingerprints:
+    """Rows hashed once, reused to report, drop and re-check duplicates.
+
+    `duplicated` matches df.duplicated() (first occurrence kept) as long as
+    there are no hash collisions, which collisions() can confirm.
+    """
+
+    def __init__(self, df, columns=None):
+        self.hashes = row_hashes(df, columns)
+        _, first, inverse = np.unique(self.hashes, return_index=True, return_inverse=True)
+        # position of the first row carrying the same fingerprint
+        self.first = first[inverse.reshape(-1)]
+        self.duplicated = self.first != np.arange(len(self.hashes))
+
+    @property
+    def count(self):
+        return int(self.duplicated.sum())
+
+    @property
+    def nbytes(self):
+        return self.hashes.nbytes + self.first.nbytes + self.duplicated.nbytes
+
+    def remaining(self):
+        """Duplicates left once the flagged rows are dropped, from the hashes alone."""
+        kept = self.hashes[~self.duplicated]
+        return len(kept) - len(np.unique(kept))
+
+    def collisions(self, df, columns=None):
+        """Flagged rows whose values differ from the row they were matched to."""
+        frame = df[columns] if columns is not None else df
+        positions = np.flatnonzero(self.duplicated)
+        if not len(positions):
+            return 0
+        rows = frame.iloc[positions].reset_index(drop=True)
+        firsts = frame.iloc[self.first[positions]].reset_index(drop=True)
+        same = (rows == firsts) | (rows.isna() & firsts.isna())
+        return int((~same.all(axis=1)).sum())
+
+
+# bumped when the saved layout changes, so older files count as stale
+HASHES_FORMAT = 2
+
+
+def save_hashes(path, hashes, key):
+    """Write fingerprints, sorted and unique, with the dataset version they were computed for.
+
+    Returns the array as saved. Loading it back needs no sorting, see
+    HashIndex.add_sorted().
+    """
+    hashes = np.unique(np.asarray(hashes, dtype=np.uint64))
+    atomic_write(path, lambda f: np.savez(f, hashes=hashes, key=np.array(json.dumps(key)), format=HASHES_FORMAT))
+    return hashes
+
+
+def load_hashes(path, key):
+    """Sorted unique fingerprints saved for `key`, or None when missing or stale."""
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as saved:
+        if "format" not in saved or int(saved["format"]) != HASHES_FORMAT:
+            return None
+        if str(saved["key"]) != json.dumps(key):
+            return None
+        return saved["hashes"]
+
+
+class HashIndex:
+    """Set of row fingerprints kept as a few sorted uint64 arrays.
+
+    Lookups are a binary search per part, and adding a batch only sorts the
+    batch; once there are too many parts the two smallest are merged, so the
+    large part holding the history is rarely rewritten.
+    """
+
+    MAX_PARTS = 8
+
+    def __init__(self, hashes=None):
+        self._parts = []
+        if hashes is not None:
+            self.add(hashes)
+
+    def __len__(self):
+        return sum(len(part) for part in self._parts)
+
+    def contains(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        found = np.zeros(len(hashes), dtype=bool)
+        for part in self._parts:
+            positions = np.searchsorted(part, hashes).clip(max=len(part) - 1)
+            found |= part[positions] == hashes
+        return found
+
+    def add(self, hashes):
+        return self.add_sorted(np.unique(np.asarray(hashes, dtype=np.uint64)))
+
+    def add_sorted(self, part):
+        """Add fingerprints that are already sorted and unique, as load_hashes() returns them."""
+        if len(part):
+            self._parts.append(part)
+        while len(self._parts) > self.MAX_PARTS:
+            self._parts.sort(key=len)
+            # two sorted runs: the stable sort (timsort) merges them in linear time
+            merged = np.sort(np.concatenate(self._parts[:2]), kind="stable")
+            merged = merged[np.append(True, merged[1:] != merged[:-1])]
+            self._parts = [merged] + self._parts[2:]
+        return self
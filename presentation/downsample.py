@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# most points a line plot is given; a 15in figure at 200 dpi is 3000 px wide
+TARGET_POINTS = int(os.environ.get("DOWNSAMPLE_POINTS", 1500))
+
+
+def lttb(x, y, threshold):
+    """Positions of the points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept; every bucket in between keeps
+    the point forming the largest triangle with the previously kept point and
+    the next bucket's average, which preserves peaks and troughs.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[stop:next_stop].mean()
+        avg_y = y[stop:next_stop].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        kept[i + 1] = a
+    return kept
+
+
+def downsample(series, target=TARGET_POINTS):
+    """`series` reduced to at most `target` points with LTTB.
+
+    Empty buckets (NaN) are dropped before reducing; at the densities where
+    reduction kicks in their gaps are narrower than a pixel.
+    """
+    if len(series) <= target:
+        return series
+    dense = series.dropna()
+    index = dense.index
+    x = index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy()
+    return dense.iloc[lttb(x, dense.to_numpy(), target)]
+
+
+def reduction_note(original, reduced):
+    """Caption reporting how much a series was downsampled."""
+    ratio = len(original) / len(reduced) if len(reduced) else 1.0
+    return f"{len(reduced):,} of {len(original):,} points plotted ({ratio:.1f}x reduction)"
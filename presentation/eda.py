@@ -34,6 +34,8 @@ import seaborn as sns
 import datetime as dt
 from sklearn.preprocessing import OneHotEncoder,LabelEncoder, OrdinalEncoder
 
+from aggregations import breakdown, grouped_slices
+
 """# date insertion"""
 
 df=pd.read_csv('sales_for_course.csv')
@@ -231,6 +233,8 @@ plt.show()
 state with quantity of sales
 """
 
+state_totals=grouped_slices(df,"Country","State",["Quantity","profit"])
+
 fig,axes=plt.subplots(2,2,figsize=(20,10))
 axes=axes.flatten()
 country=['United States','United Kingdom', 'Germany','France']
@@ -238,7 +242,7 @@ var=0
 for cou in country:
     ax=axes[var]
     var=var+1
-    quantity_state = df[df["Country"]==cou].groupby("State")["Quantity"].sum().reset_index()
+    quantity_state = state_totals[cou]["Quantity"].reset_index()
     ax.bar(quantity_state["State"], quantity_state["Quantity"])
     ax.set_xlabel(f"sales in {cou}")
     ax.set_ylabel("Sum of Quantity")
@@ -258,7 +262,7 @@ var=0
 for cou in country:
     ax=axes[var]
     var=var+1
-    quantity_state = df[df["Country"]==cou].groupby("State")["profit"].sum().reset_index()
+    quantity_state = state_totals[cou]["profit"].reset_index()
     ax.bar(quantity_state["State"], quantity_state["profit"])
     ax.set_xlabel(f"sales in {cou}")
     ax.set_ylabel("Sum of profit")
@@ -287,25 +291,17 @@ plt.show()
 
 """the profit over product"""
 
-Accessories=df[df["Product Category"]=="Accessories"]["profit"].sum()
-Bikes=df[df["Product Category"]=="Bikes"]["profit"].sum()
-Clothing=df[df["Product Category"]=="Clothing"]["profit"].sum()
-categories = ["Accessories", "Bikes", "Clothing"]
-profits = [Accessories, Bikes, Clothing]
+profit_breakdown=breakdown(df,"Product Category","profit")
+categories = profit_breakdown.index
+profits = profit_breakdown["total"]
 plt.pie(profits, labels=categories, autopct='%1.1f%%', startangle=140)
 plt.show()
 
 """show with value"""
 
-def show_values(pct, all_vals):
-    absolute = int(pct/100.*sum(all_vals))
-    return f"{absolute}"
-plt.pie(
-    profits,
-    labels=categories,
-    autopct=lambda pct: show_values(pct, profits),
-    startangle=140
-)
+_, _, autotexts = plt.pie(profits, labels=categories, autopct="%1.1f%%", startangle=140)
+for text, absolute in zip(autotexts, profit_breakdown["absolute"]):
+    text.set_text(f"{absolute}")
 plt.title("Total Profit by Product Category")
 plt.axis('equal')
 plt.show()
@@ -0,0 +1,32 @@
+import math
+
+from figure_cache import subplots
+
+
+def split_panels(df, facets, x, y, agg="mean"):
+    """Aggregate `y` per `x` inside every facet combination in one groupby.
+
+    Returns {facet key: series indexed by x}; keys are tuples when more than
+    one facet column is given.
+    """
+    levels = list(range(len(facets)))
+    totals = df.groupby(facets + [x], observed=True)[y].agg(agg)
+    level = levels if len(facets) > 1 else 0
+    return {key: part.droplevel(levels) for key, part in totals.groupby(level=level, observed=True)}
+
+
+def small_multiples(panels, ncols=4, panel_size=(5, 2.5), title=None, panel_title="{}"):
+    """One line chart per panel, laid out for however many panels there are."""
+    nrows = max(1, math.ceil(len(panels) / ncols))
+    fig, axes = subplots(nrows, ncols, figsize=(panel_size[0] * ncols, panel_size[1] * nrows),
+                         squeeze=False)
+    axes = axes.flatten()
+    for ax, (key, series) in zip(axes, panels.items()):
+        ax.plot(series.index, series.values)
+        ax.set_title(panel_title.format(*key) if isinstance(key, tuple) else panel_title.format(key))
+    for ax in axes[len(panels):]:
+        ax.set_visible(False)
+    if title:
+        fig.suptitle(title, fontsize=16, fontweight="bold")
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,100 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# rendered images kept per process, least recently used evicted first
+MAX_BYTES = int(os.environ.get("FIGURE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+SAVEFIG_KWARGS = {"dpi": 200, "bbox_inches": "tight"}
+
+
+class FigureCache:
+    """LRU cache of rendered figure bytes, bounded by total size."""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        with self._lock:
+            if key in self._items:
+                self.size -= len(self._items.pop(key))
+            if len(data) > self.max_bytes:
+                return
+            self._items[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, old = self._items.popitem(last=False)
+                self.size -= len(old)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+
+_figures = FigureCache()
+
+
+def subplots(nrows=1, ncols=1, figsize=None, **kwargs):
+    """plt.subplots without pyplot: an Agg figure of its own, safe to build off the main thread."""
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots(nrows, ncols, **kwargs)
+
+
+def figure_bytes(fig, fmt="png"):
+    """Save a figure to bytes and close it so matplotlib lets go of it."""
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format=fmt, **SAVEFIG_KWARGS)
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+def figure_key(view, chart, data_key, params=None, fmt="png"):
+    """Cache key of a chart; pass the dataset fingerprint as data_key so a new csv invalidates every chart."""
+    return view, chart, data_key, tuple(sorted((params or {}).items())), fmt
+
+
+def get_figure(key):
+    return _figures.get(key)
+
+
+def put_figure(key, data):
+    _figures.put(key, data)
+
+
+def render(view, chart, data_key, build, params=None, fmt="png"):
+    """Bytes of the figure `build()` returns, built only on a cache miss."""
+    key = figure_key(view, chart, data_key, params, fmt)
+    data = _figures.get(key)
+    if data is None:
+        data = figure_bytes(build(), fmt)
+        _figures.put(key, data)
+    return data
+
+
+def cache_info():
+    return {"hits": _figures.hits, "misses": _figures.misses,
+            "bytes": _figures.size, "entries": len(_figures._items)}
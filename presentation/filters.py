@@ -0,0 +1,89 @@
+from functools import reduce
+
+import numpy as np
+
+from loader import DATA_PATH
+from store import dataset_key, load_clean
+from versioned import VersionCache
+
+# filtered by picking values
+VALUE_COLUMNS = ["Country", "State", "Product Category", "Sub Category", "Customer Gender"]
+# filtered by an inclusive (low, high) range; Date ranges go through dateindex
+RANGE_COLUMNS = ["Customer Age"]
+
+_indexes = VersionCache()
+
+
+def _pack(positions, n):
+    bits = np.zeros(n, dtype=bool)
+    bits[positions] = True
+    return np.packbits(bits)
+
+
+class FilterIndex:
+    """Bitmap per value of the value columns and a sorted order of the range columns.
+
+    select() resolves a filter combination as OR over the bitmaps of the
+    values picked in a column and AND across columns; a range is two binary
+    searches over the sorted column. Bitmaps are bit-packed, n / 8 bytes each.
+    """
+
+    def __init__(self, df, value_columns=VALUE_COLUMNS, range_columns=RANGE_COLUMNS):
+        self.n = len(df)
+        self.bitmaps = {}
+        for col in value_columns:
+            positions = df.groupby(col, observed=True).indices
+            self.bitmaps[col] = {value: _pack(rows, self.n) for value, rows in positions.items()}
+        self.ranges = {}
+        for col in range_columns:
+            values = df[col].to_numpy()
+            order = np.argsort(values, kind="stable")
+            self.ranges[col] = (values[order], order)
+
+    @property
+    def nbytes(self):
+        bitmaps = sum(bits.nbytes for col in self.bitmaps.values() for bits in col.values())
+        return bitmaps + sum(values.nbytes + order.nbytes for values, order in self.ranges.values())
+
+    def options(self, col):
+        return list(self.bitmaps[col])
+
+    def bounds(self, col):
+        values, _ = self.ranges[col]
+        return values[0], values[-1]
+
+    def select(self, selection):
+        """Boolean row mask for `selection`, or None when it keeps every row.
+
+        `selection` maps value columns to the values to keep (empty keeps all)
+        and range columns to an inclusive (low, high) pair.
+        """
+        empty = np.zeros((self.n + 7) // 8, dtype=np.uint8)
+        result = None
+        for col, chosen in selection.items():
+            if col in self.bitmaps:
+                if not chosen:
+                    continue
+                bits = reduce(np.bitwise_or, [self.bitmaps[col].get(value, empty) for value in chosen])
+            else:
+                values, order = self.ranges[col]
+                low, high = (np.asarray(bound, dtype=values.dtype) for bound in chosen)
+                start = np.searchsorted(values, low, side="left")
+                stop = np.searchsorted(values, high, side="right")
+                if start == 0 and stop == self.n:
+                    continue
+                bits = _pack(order[start:stop], self.n)
+            result = bits if result is None else result & bits
+        if result is None:
+            return None
+        return np.unpackbits(result, count=self.n).astype(bool)
+
+
+def selection_key(selection):
+    """Hashable form of a selection, for cache keys."""
+    return tuple(sorted((col, tuple(chosen)) for col, chosen in selection.items()))
+
+
+def load_filter_index(source=DATA_PATH):
+    """Return (FilterIndex of the cleaned table, hit), built once per dataset version."""
+    return _indexes.get(dataset_key(source), lambda: FilterIndex(load_clean(source)[0]))
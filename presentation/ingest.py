@@ -0,0 +1,96 @@
+import os
+import sys
+
+import pandas as pd
+
+import cube
+import kpi
+from cleaning import ORDER, clean_sales
+from dedup import HashIndex, load_hashes, row_hashes, save_hashes
+from loader import DATA_PATH
+from schema import SALES_DTYPES, read_sales_csv
+from store import CLEAN_PATH, dataset_key, files_since, read_table, write_segment
+from versioned import VersionCache
+
+# a row is a duplicate when all of its cleaned fields match a stored row
+KEY_COLUMNS = ORDER
+
+_indexes = VersionCache()
+
+
+def check_columns(path):
+    """Raise ValueError unless the file has every column of the sales layout."""
+    columns = pd.read_csv(path, nrows=0).columns
+    missing = [col for col in SALES_DTYPES if col not in columns]
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
+
+
+def hashes_path(path):
+    """Where the row fingerprints of a feather file are kept."""
+    return path[: -len(".feather")] + ".hashes.npz"
+
+
+def _file_hashes(path, key):
+    hashes = load_hashes(hashes_path(path), key)
+    if hashes is None:
+        hashes = save_hashes(hashes_path(path), row_hashes(read_table(path), KEY_COLUMNS), key)
+    return hashes
+
+
+def load_hash_index(source=DATA_PATH, target=CLEAN_PATH):
+    """HashIndex of every stored row, built once per dataset version.
+
+    Fingerprints are saved sorted next to the base table and each segment,
+    so a new process loads them straight in as index parts instead of
+    rehashing or re-sorting the stored rows.
+    """
+    key = dataset_key(source, target)
+
+    def build():
+        # only re-materializes the base table when the csv changed
+        index, files = files_since(_indexes.items(), key, source, target)
+        if index is None:
+            index = HashIndex()
+        for path, file_key in files:
+            index.add_sorted(_file_hashes(path, file_key))
+        return index
+
+    index, _ = _indexes.get(key, build)
+    return index
+
+
+def append_batch(path, source=DATA_PATH, target=CLEAN_PATH):
+    """Validate, clean and append a new sales file to the stored table.
+
+    Only the batch is cleaned and hashed; rows already stored are skipped via
+    the hash index, the rest become a new segment. The segment's
+    fingerprints, cube and KPI totals are saved next to it, so every process
+    folds them in instead of rescanning the table.
+    """
+    check_columns(path)
+    raw = read_sales_csv(path)
+    batch = clean_sales(raw)
+
+    index = load_hash_index(source, target)
+    hashes = row_hashes(batch, KEY_COLUMNS)
+    # a row repeated inside the batch counts once, as when it is appended again later
+    new = ~index.contains(hashes) & ~pd.Series(hashes).duplicated().to_numpy()
+    result = {"rows": len(raw), "cleaned": len(batch), "duplicates": int((~new).sum())}
+
+    batch = batch[new].reset_index(drop=True)
+    result["appended"] = len(batch)
+    if not len(batch):
+        return result
+
+    # caches of the older version, here or in other processes, fold these in on their next load
+    segment = write_segment(batch, target)
+    save_hashes(hashes_path(segment), hashes[new], os.path.basename(segment))
+    cube.save_batch(segment, batch)
+    kpi.save_batch(segment, batch)
+    return result
+
+
+if __name__ == "__main__":
+    for batch_path in sys.argv[1:]:
+        print(batch_path, append_batch(batch_path))
@@ -0,0 +1,160 @@
+import copy
+import json
+import os
+
+from atomic import atomic_write
+from loader import DATA_PATH
+from store import CLEAN_PATH, dataset_key, files_since, load_clean, read_table
+from versioned import VersionCache
+
+
+class KpiTotals:
+    """Running header totals, updated from batches of cleaned rows.
+
+    update() costs O(batch); snapshot() just returns the last computed values,
+    so the header can read it on every rerun.
+    """
+
+    def __init__(self):
+        self.revenue = 0.0
+        self.profit = 0.0
+        self.countries = set()
+        # (year, month) -> [revenue, profit]
+        self.periods = {}
+        self._snapshot = self._compute()
+
+    def update(self, rows):
+        self.revenue += float(rows["Revenue"].sum())
+        self.profit += float(rows["profit"].sum())
+        self.countries.update(str(country) for country in rows["Country"].unique())
+        sums = rows.groupby(["year", "month"])[["Revenue", "profit"]].sum()
+        for (year, month), (revenue, profit) in zip(sums.index, sums.to_numpy()):
+            period = self.periods.setdefault((int(year), int(month)), [0.0, 0.0])
+            period[0] += float(revenue)
+            period[1] += float(profit)
+        self._snapshot = self._compute()
+        return self
+
+    def merge(self, other):
+        """Fold in the totals of other rows, as if update() had seen them too."""
+        self.revenue += other.revenue
+        self.profit += other.profit
+        self.countries.update(other.countries)
+        for period, (revenue, profit) in other.periods.items():
+            totals = self.periods.setdefault(period, [0.0, 0.0])
+            totals[0] += revenue
+            totals[1] += profit
+        self._snapshot = self._compute()
+        return self
+
+    def to_dict(self):
+        return {
+            "revenue": self.revenue,
+            "profit": self.profit,
+            "countries": sorted(self.countries),
+            "periods": [[year, month, revenue, profit] for (year, month), (revenue, profit) in self.periods.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        kpis = cls()
+        kpis.revenue = data["revenue"]
+        kpis.profit = data["profit"]
+        kpis.countries = set(data["countries"])
+        kpis.periods = {(year, month): [revenue, profit] for year, month, revenue, profit in data["periods"]}
+        kpis._snapshot = kpis._compute()
+        return kpis
+
+    def _compute(self):
+        snapshot = {
+            "revenue": self.revenue,
+            "profit": self.profit,
+            "countries": len(self.countries),
+            "period": None,
+            "previous_period": None,
+            "revenue_delta": None,
+            "profit_delta": None,
+        }
+        if len(self.periods) >= 2:
+            previous, latest = sorted(self.periods)[-2:]
+            snapshot["period"] = latest
+            snapshot["previous_period"] = previous
+            for i, name in enumerate(["revenue_delta", "profit_delta"]):
+                before = self.periods[previous][i]
+                if before:
+                    snapshot[name] = (self.periods[latest][i] - before) / abs(before)
+        return snapshot
+
+    def snapshot(self):
+        return self._snapshot
+
+
+_totals = VersionCache()
+
+
+def totals_path(path):
+    """Where the KPI totals of a feather file (the base table or one segment) are kept."""
+    return path[: -len(".feather")] + ".kpi.json"
+
+
+def save_totals(path, kpis, key):
+    """Write totals with the file key they were computed for, see store.files_since()."""
+    atomic_write(path, lambda f: json.dump({"key": key, "totals": kpis.to_dict()}, f), mode="w")
+
+
+def load_saved_totals(path, key):
+    """KpiTotals saved for `key`, or None when missing or stale."""
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if saved["key"] != key:
+        return None
+    return KpiTotals.from_dict(saved["totals"])
+
+
+def _file_totals(path, key):
+    kpis = load_saved_totals(totals_path(path), key)
+    if kpis is None:
+        kpis = KpiTotals().update(read_table(path))
+        save_totals(totals_path(path), kpis, key)
+    return kpis
+
+
+def load_kpis(source=DATA_PATH, target=CLEAN_PATH):
+    """KpiTotals for the cleaned table, built once per dataset version.
+
+    Totals are saved next to the base table and every segment and summed
+    here, so a new process never rescans the rows, and one holding an older
+    version only adds the segments appended since.
+    """
+    key = dataset_key(source, target)
+
+    def build():
+        try:
+            cached, files = files_since(_totals.items(), key, source, target)
+        except ImportError:
+            df, _ = load_clean(source, target)
+            return KpiTotals().update(df)
+        # the cached totals may be in use by other sessions
+        kpis = copy.deepcopy(cached) if cached is not None else KpiTotals()
+        for path, file_key in files:
+            kpis.merge(_file_totals(path, file_key))
+        return kpis
+
+    kpis, _ = _totals.get(key, build)
+    return kpis
+
+
+def save_batch(segment, batch):
+    """Save the totals of the rows appended as `segment`, for every process to add in."""
+    save_totals(totals_path(segment), KpiTotals().update(batch), os.path.basename(segment))
+
+
+def format_money(value):
+    if abs(value) >= 1_000_000:
+        return f"${value / 1_000_000:.2f}M"
+    if abs(value) >= 1_000:
+        return f"${value / 1_000:.0f}K"
+    return f"${value:.0f}"
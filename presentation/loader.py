@@ -0,0 +1,39 @@
+import os
+
+from schema import read_sales_csv
+from versioned import VersionCache
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sales_for_course.csv")
+
+# "c" or "pyarrow"
+ENGINE = os.environ.get("SALES_CSV_ENGINE", "c")
+
+# one entry per csv, shared by every streamlit session running in this process
+_frames = VersionCache(slot=lambda key: key[0])
+
+
+def fingerprint(path=DATA_PATH):
+    """(path, mtime, size) key that changes whenever the file on disk changes."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def _read(path):
+    return read_sales_csv(path, engine=ENGINE)
+
+
+def load_sales(path=DATA_PATH):
+    """Return (df, hit) for the raw sales csv.
+
+    The csv is parsed once per (path, mtime, size); every caller after that
+    gets a shallow copy of the cached frame, so adding or replacing columns
+    on a page never leaks into the shared copy.
+    """
+    key = fingerprint(path)
+    df, hit = _frames.get(key, lambda: _read(key[0]))
+    return df.copy(deep=False), hit
+
+
+def clear_cache():
+    _frames.clear()
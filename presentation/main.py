@@ -1,51 +1,70 @@
+import streamlit as st
 
+from kpi import format_money, load_kpis
+from startup import IMPORT_TIMES, import_view
 
-import streamlit as st
+# view modules are only imported once their page is opened
+VIEWS = {
+    "📥 Data Overview": "data_insertion_and_overveiw",
+    "🧹 Preprocessing": "pre_processing",
+    "📈 visualization": "visualization",
+}
+
+
+def period_delta(kpis, change):
+    if change is None:
+        return None
+    year, month = kpis["period"]
+    return f"{change:+.1%} in {month}/{year} vs previous month"
+
+
+def main():
+    st.set_page_config(
+        page_title="Sales Dashboard", layout="wide", initial_sidebar_state="expanded"
+    )
+
+    st.sidebar.image("https://cdn-icons-png.flaticon.com/512/3063/3063826.png", width=80)
+    st.sidebar.title("📊 Sales Dashboard")
+    st.sidebar.markdown(
+        "Welcome to the 2-Year Sales Analysis App. Use the navigation below to explore different parts of the data."
+    )
 
-st.set_page_config(
-    page_title="Sales Dashboard", layout="wide", initial_sidebar_state="expanded"
-)
+    view = st.sidebar.radio(
+        "🔍 Navigate to:", list(VIEWS)
+    )
 
 
-import data_insertion_and_overveiw
-import pre_processing
-import visualization
+    st.title("📊 Sales Analytics Dashboard")
 
-st.sidebar.image("https://cdn-icons-png.flaticon.com/512/3063/3063826.png", width=80)
-st.sidebar.title("📊 Sales Dashboard")
-st.sidebar.markdown(
-    "Welcome to the 2-Year Sales Analysis App. Use the navigation below to explore different parts of the data."
-)
+    st.markdown("### 🔢 Key Metrics")
+    kpis = load_kpis().snapshot()
 
-view = st.sidebar.radio(
-    "🔍 Navigate to:", ["📥 Data Overview", "🧹 Preprocessing", "📈 visualization"]
-)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Revenue", format_money(kpis["revenue"]), delta=period_delta(kpis, kpis["revenue_delta"]))
+    with col2:
+        st.metric("Total Profit", format_money(kpis["profit"]), delta=period_delta(kpis, kpis["profit_delta"]))
+    with col3:
+        st.metric("Countries", kpis["countries"])
 
+    st.markdown("---")
 
-st.title("📊 Sales Analytics Dashboard")
 
-st.markdown("### 🔢 Key Metrics")
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.metric("Total Revenue", "$1.23M")
-with col2:
-    st.metric("Total Profit", "$430K")
-with col3:
-    st.metric("Countries", "15+")
+    import_view(VIEWS[view]).show()
 
-st.markdown("---")
+    with st.sidebar.expander("⏱️ Startup timings"):
+        for name, seconds in IMPORT_TIMES.items():
+            st.write(f"`{name}`: {seconds * 1000:.0f} ms")
 
 
-if view == "📥 Data Overview":
-    data_insertion_and_overveiw.show()
-elif view == "🧹 Preprocessing":
-    pre_processing.show()
-elif view == "📈 visualization":
-    visualization.show()
+    st.markdown("---")
+    st.markdown(
+        "<p style='text-align: center;'>Built with ❤️ using Streamlit</p>",
+        unsafe_allow_html=True,
+    )
 
 
-st.markdown("---")
-st.markdown(
-    "<p style='text-align: center;'>Built with ❤️ using Streamlit</p>",
-    unsafe_allow_html=True,
-)
+# streamlit runs this file as __main__; worker processes of the render and
+# aggregation pools import it as __mp_main__ and must not run the page
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+PAGE_SIZES = [25, 50, 100, 500]
+
+# row orders of recent sort/filter queries, so paging through one is a slice
+MAX_QUERIES = 16
+
+_indexes = {}
+_queries = OrderedDict()
+_lock = threading.Lock()
+
+
+def _sort_index(column):
+    """Row positions in ascending order with empty cells last, plus the non-empty count."""
+    ordered = column.reset_index(drop=True).sort_values(kind="stable", na_position="last")
+    return ordered.index.to_numpy(), int(column.notna().sum())
+
+
+def _value_index(column):
+    """{value: row positions}, for equality filters."""
+    return column.groupby(column, observed=True).indices
+
+
+def _index(df, data_key, kind, column):
+    """Sort or value index of one column, built once per dataset version."""
+    key = (data_key, kind, column)
+    with _lock:
+        index = _indexes.get(key)
+    if index is None:
+        build = _sort_index if kind == "sort" else _value_index
+        index = build(df[column])
+        with _lock:
+            for old in [k for k in _indexes if k[0] != data_key]:
+                del _indexes[old]
+            _indexes[key] = index
+    return index
+
+
+def query(df, data_key, sort=None, ascending=True, where=None):
+    """Row positions matching `where` in `sort` order, or None for every row as stored.
+
+    `where` maps columns to a single value, e.g. {"Country": "France"}. Both
+    go through per-column indexes, so only the first query of a kind scans
+    the table.
+    """
+    if sort is None and not where:
+        return None
+    key = (data_key, sort, ascending, tuple(sorted((where or {}).items())))
+    with _lock:
+        positions = _queries.get(key)
+        if positions is not None:
+            _queries.move_to_end(key)
+            return positions
+
+    order = None
+    if sort is not None:
+        order, filled = _index(df, data_key, "sort", sort)
+        if not ascending:
+            order = np.concatenate([order[:filled][::-1], order[filled:]])
+    if where:
+        keep = None
+        for column, value in where.items():
+            matches = np.zeros(len(df), dtype=bool)
+            matches[_index(df, data_key, "values", column).get(value, [])] = True
+            keep = matches if keep is None else keep & matches
+        order = order[keep[order]] if order is not None else np.flatnonzero(keep)
+
+    with _lock:
+        _queries[key] = order
+        while len(_queries) > MAX_QUERIES:
+            _queries.popitem(last=False)
+    return order
+
+
+def page(df, positions, number, size):
+    """Rows of page `number` (from 1) of `size` rows; only that window is copied."""
+    start = (number - 1) * size
+    if positions is None:
+        return df.iloc[start:start + size]
+    return df.iloc[positions[start:start + size]]
@@ -0,0 +1,116 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+WORKERS = int(os.environ.get("SALES_WORKERS", os.cpu_count() or 1))
+
+# below this many rows per worker the pool costs more than it saves
+MIN_ROWS_PER_WORKER = 500_000
+
+# scratch space for the columns handed to workers, memory-mapped and in RAM when possible;
+# unrelated to shared.SHARED_DIR, where the dataset server publishes
+SCRATCH_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """The worker pool, started on first use.
+
+    Workers come from a forkserver: forking the Streamlit process directly
+    would copy locks held by its other threads into the children. Each
+    worker imports the entry script as __mp_main__, so main.py keeps the page
+    under its __main__ guard.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("forkserver"))
+    return _pool
+
+
+def _encode(column):
+    """Integer codes starting at 0 plus a function turning codes back into values."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        categories = column.cat.categories
+        return (column.cat.codes.to_numpy().astype(np.int64), len(categories),
+                lambda codes: pd.Categorical.from_codes(codes, categories))
+    if pd.api.types.is_integer_dtype(column):
+        low = int(column.min())
+        return (column.to_numpy().astype(np.int64) - low, int(column.max()) - low + 1,
+                lambda codes: (codes + low).astype(column.dtype))
+    codes, uniques = pd.factorize(column, sort=True)
+    return codes.astype(np.int64), len(uniques), lambda codes: uniques.take(codes)
+
+
+def _partial_sums(key, measures):
+    """(unique keys, sums per measure, row counts) for one slice of rows."""
+    keys, inverse = np.unique(key, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    sums = np.vstack([np.bincount(inverse, weights=values, minlength=len(keys)) for values in measures])
+    return keys, sums, np.bincount(inverse, minlength=len(keys))
+
+
+def _partition_sums(paths, start, stop):
+    """Worker entry point: memory-map the scratch columns and sum rows [start, stop)."""
+    key = np.load(paths[0], mmap_mode="r")[start:stop]
+    measures = [np.load(path, mmap_mode="r")[start:stop] for path in paths[1:]]
+    return _partial_sums(key, measures)
+
+
+def workers_for(rows, workers=WORKERS):
+    """How many processes are worth starting for `rows` rows."""
+    return max(1, min(workers, rows // MIN_ROWS_PER_WORKER))
+
+
+def grouped_sums(df, by, measures, workers=WORKERS):
+    """Sum `measures` and count rows per `by` group, split across processes.
+
+    Rows are partitioned into contiguous ranges; every worker reduces its
+    range to partial sums over the memory-mapped columns and the partials are
+    merged. Returns the same frame as
+    df.groupby(by, observed=True).agg(<measure>=sum, count=size).reset_index().
+    """
+    encoded = [_encode(df[col]) for col in by]
+    key = np.zeros(len(df), dtype=np.int64)
+    for codes, size, _ in encoded:
+        key = key * size + codes
+    values = [df[measure].to_numpy(dtype=np.float64) for measure in measures]
+
+    workers = workers_for(len(df), workers)
+    if workers == 1:
+        keys, sums, counts = _partial_sums(key, values)
+    else:
+        with tempfile.TemporaryDirectory(dir=SCRATCH_DIR) as scratch:
+            paths = []
+            for i, array in enumerate([key] + values):
+                paths.append(os.path.join(scratch, f"{i}.npy"))
+                np.save(paths[-1], array)
+            bounds = np.linspace(0, len(df), workers + 1).astype(int)
+            futures = [_get_pool().submit(_partition_sums, paths, start, stop)
+                       for start, stop in zip(bounds[:-1], bounds[1:])]
+            parts = [future.result() for future in futures]
+        # partials share keys across ranges; summing them again merges them
+        keys = np.concatenate([part[0] for part in parts])
+        sums = np.hstack([part[1] for part in parts])
+        counts = np.concatenate([part[2] for part in parts]).astype(np.float64)
+        keys, merged, _ = _partial_sums(keys, list(sums) + [counts])
+        sums, counts = merged[:-1], merged[-1].astype(np.int64)
+
+    result = {}
+    for col, (_, size, decode) in reversed(list(zip(by, encoded))):
+        result[col] = decode(keys % size)
+        keys = keys // size
+    result = pd.DataFrame({col: result[col] for col in by})
+    for measure, total in zip(measures, sums):
+        if pd.api.types.is_integer_dtype(df[measure]):
+            total = total.round().astype(np.int64)
+        result[measure] = total
+    result["count"] = counts
+    return result
@@ -1,27 +1,50 @@
-import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
-import seaborn as sns
-import datetime as dt
-from sklearn.preprocessing import OneHotEncoder,LabelEncoder, OrdinalEncoder
 import streamlit as st 
 
+from cleaning import SALES_PIPELINE
+from dedup import RowFingerprints
+from downsample import downsample, reduction_note
+from figure_cache import render
+from loader import fingerprint, load_sales
+from timeseries import resample
+
+
+# duplicate report per csv version; the cleaned stages live in SALES_PIPELINE
+_duplicate_reports = {}
+# daily profit of the derive_profit stage, per csv version like the figures
+_daily_profit = {}
 
 
 def show():
-    df=pd.read_csv("sales_for_course.csv")  
+    data_key = fingerprint()
+
+    def show_figure(chart, build, **params):
+        st.image(render("pre_processing", chart, data_key, build, params))
+
+    raw, hit = load_sales()
+
+    def stage(step):
+        return SALES_PIPELINE.output(raw, data_key, step)
+
     st.header("pre_processing")
+    st.caption("dataset served from cache" if hit else "dataset parsed from csv")
 
     """# Pre-processing
 
     detect duplicates
     """
     st.subheader("Detecting Duplicates")
-    duplicates = df[df.duplicated()]
+    if data_key not in _duplicate_reports:
+        row_fingerprints = RowFingerprints(raw)
+        _duplicate_reports.clear()
+        _duplicate_reports[data_key] = (raw[row_fingerprints.duplicated], row_fingerprints.nbytes,
+                                        row_fingerprints.collisions(raw), row_fingerprints.remaining())
+    duplicates, fingerprint_bytes, collisions, duplicates_left = _duplicate_reports[data_key]
     st.write("Number of duplicate rows in the data:")
     st.dataframe(duplicates)
-    df = df.drop_duplicates()
-    duplicates_left = df.duplicated().sum()
+    st.caption(f"{len(raw)} rows hashed into {fingerprint_bytes / 1024:.0f} KB of fingerprints, "
+               f"{collisions} hash collisions")
+    df = stage("dedupe")
 
     if duplicates_left == 0:
         st.success("All duplicates have been successfully not exist 🎉")
@@ -31,9 +54,9 @@ def show():
     st.markdown("""
     ### Handling Method:
 
-    - We detected duplicates using `duplicated()`, which returns only the duplicate rows.
-    - Then, we removed these duplicate rows using `drop_duplicates()`, which keeps the first occurrence of each duplicate set.
-    - Finally, we checked the number of remaining duplicates using `duplicated().sum()` to ensure there were none left.
+    - We hashed every row once into a 64-bit fingerprint; a row whose fingerprint was already seen is a duplicate, the same rows `duplicated()` returns.
+    - Then, we removed these duplicate rows, keeping the first occurrence of each duplicate set like `drop_duplicates()` does.
+    - Finally, we checked the number of remaining duplicates from the same fingerprints to ensure there were none left.
     """)
 
 
@@ -56,14 +79,19 @@ def show():
     - This decision was made because the number of missing values is not large, and it is better not to include incomplete data that might affect analytical or graphical models.
     """)
 
+    df = stage("dropna")
+
     """outliers"""
     st.subheader("Boxplot of Revenue vs Customer Age to detect outlier")
-    fig, ax = plt.subplots()
-    sns.boxplot(data=df[["Revenue", "Customer Age"]], ax=ax)
-    ax.set_title("Revenue vs Customer Age Boxplot")
+    def plot_outliers():
+        import seaborn as sns
 
+        fig, ax = plt.subplots()
+        sns.boxplot(data=df[["Revenue", "Customer Age"]], ax=ax)
+        ax.set_title("Revenue vs Customer Age Boxplot")
+        return fig
 
-    st.pyplot(fig)
+    show_figure("outliers", plot_outliers)
 
 
     st.markdown("""
@@ -76,7 +104,7 @@ def show():
 
     """ Dropping unnecessary columns"""
     st.subheader("Dropping Unnecessary Columns")
-    df = df.drop(columns=["index", "Column1", "Year"])
+    df = stage("drop_columns")
 
     st.write("Here are the first 10 rows of the dataset after dropping unnecessary columns:")
     st.dataframe(df.head(10))
@@ -95,12 +123,7 @@ def show():
 
     """# create columns to date"""
 
-    df["Date"] = pd.to_datetime(df["Date"])
-    df = df.sort_values(by="Date").reset_index(drop=True)
-
-    df["year"] = df["Date"].dt.year
-    df["month"] = df["Date"].dt.month
-    df["day"] = df["Date"].dt.day
+    df = stage("derive_date_parts")
 
     st.write("Here are the first 10 rows after extracting year, month, and day:")
     st.dataframe(df.head(10))
@@ -120,11 +143,7 @@ def show():
 
     '''Feature selection: Reordering columns'''
     st.subheader("Feature Selection: Reordering Columns")
-    order = ["Date", "day", "month", "Month", "year", "Customer Age", "Customer Gender", 
-            "Country", "State", "Product Category", "Sub Category", "Quantity", 
-            "Unit Cost", "Unit Price", "Cost", "Revenue"]
-
-    df = df[order]
+    df = stage("reorder")
     st.write("Here are the first 10 rows of the dataset after feature selection:")
     st.dataframe(df.head(10))
 
@@ -138,16 +157,27 @@ def show():
     st.subheader("Feature Extraction: Calculating Profit")
 
 
-    df["profit"] = df["Revenue"] - df["Cost"]
+    df = stage("derive_profit")
+
+    # the stage shown on this page, resampled once per csv version
+    if data_key not in _daily_profit:
+        _daily_profit.clear()
+        _daily_profit[data_key] = resample(df, "profit", "day")
+    daily_profit = _daily_profit[data_key]
+    profit_mean = downsample(daily_profit["mean"])
+    st.caption(reduction_note(daily_profit, profit_mean))
+
+    def plot_profit_over_time():
+        fig, ax = plt.subplots(figsize=(20, 5))
+        ax.plot(profit_mean.index, profit_mean.values)
+        ax.set_title("Profit Over Time")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Profit")
+        plt.xticks(rotation=45)
+        plt.tight_layout()
+        return fig
 
-    fig, ax = plt.subplots(figsize=(20, 5))
-    sns.lineplot(data=df, x="Date", y="profit", ax=ax)
-    ax.set_title("Profit Over Time")
-    ax.set_xlabel("Date")
-    ax.set_ylabel("Profit")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    st.pyplot(fig)
+    show_figure("profit_over_time", plot_profit_over_time)
     st.markdown("""
     ### Explanation:
     - We created a new column called **"profit"** by subtracting the **"Cost"** column from the **"Revenue"** column: `df["profit"] = df["Revenue"] - df["Cost"]`.
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+from loader import DATA_PATH, fingerprint
+from streaming import CHUNKSIZE, read_chunks
+from versioned import VersionCache
+
+QUANTILES = [0.25, 0.5, 0.75]
+
+_profiles = VersionCache(slot=lambda key: key[0])
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch in the style of KLL with equal-size levels.
+
+    Values enter level 0; a level holding more than `k` values is sorted and
+    every other value (random offset) moves up a level with twice the weight.
+    Memory stays around k * log2(n / k) values; rank error is about 1/k per level.
+    """
+
+    def __init__(self, k=2048, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.levels[0] = np.concatenate([self.levels[0], values[~np.isnan(values)]])
+        self._compact()
+
+    def merge(self, other):
+        for h, level in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self._compact()
+
+    def _compact(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) > self.k:
+                even = len(level) // 2 * 2
+                promoted = np.sort(level[:even])[self._rng.integers(2)::2]
+                self.levels[h] = level[even:]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def quantiles(self, qs):
+        values = np.concatenate(self.levels)
+        if not len(values):
+            return [np.nan] * len(qs)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        ranks = np.cumsum(weights[order])
+        positions = np.searchsorted(ranks, np.asarray(qs) * ranks[-1]).clip(max=len(values) - 1)
+        return values[order][positions].tolist()
+
+
+class HyperLogLog:
+    """Approximate distinct count from 2**p registers (about 1.04 / sqrt(2**p) error)."""
+
+    def __init__(self, p=12):
+        self.p = p
+        self.registers = np.zeros(2 ** p, dtype=np.uint8)
+
+    def update(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        buckets = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashes << np.uint64(self.p)
+        # position of the first set bit of the remaining bits, 64 - p + 1 if none
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        ranks = np.where(rest == 0, 64 - self.p + 1, 65 - bit_length).astype(np.uint8)
+        np.maximum.at(self.registers, buckets, ranks)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self):
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(2.0 ** -self.registers.astype(np.float64))
+        zeros = int((self.registers == 0).sum())
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class ColumnProfile:
+    """Statistics of one column accumulated chunk by chunk."""
+
+    def __init__(self):
+        self.dtype = None
+        self.rows = 0
+        self.nulls = 0
+        self.min = None
+        self.max = None
+        # count, mean and sum of squared deviations, merged with Chan's formula
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sketch = None
+        self.distinct = HyperLogLog()
+
+    def update(self, column):
+        self.dtype = str(column.dtype)
+        self.rows += len(column)
+        values = column.dropna()
+        self.nulls += len(column) - len(values)
+        if not len(values):
+            return
+        self.distinct.update(pd.util.hash_pandas_object(values, index=False).to_numpy())
+        if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+            low, high = values.min(), values.max()
+            self.min = low if self.min is None else min(self.min, low)
+            self.max = high if self.max is None else max(self.max, high)
+        if pd.api.types.is_numeric_dtype(values):
+            numbers = values.to_numpy(dtype=np.float64)
+            n, mean = len(numbers), numbers.mean()
+            m2 = ((numbers - mean) ** 2).sum()
+            total = self.n + n
+            delta = mean - self.mean
+            self.mean += delta * n / total
+            self.m2 += m2 + delta * delta * self.n * n / total
+            self.n = total
+            if self.sketch is None:
+                self.sketch = QuantileSketch()
+            self.sketch.update(numbers)
+
+    def row(self):
+        row = {"dtype": self.dtype, "non-null": self.rows - self.nulls, "nulls": self.nulls,
+               "distinct": self.distinct.count(), "min": self.min, "max": self.max}
+        if self.sketch is not None:
+            row["mean"] = self.mean
+            row["std"] = np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.nan
+            for q, value in zip(QUANTILES, self.sketch.quantiles(QUANTILES)):
+                row[f"{q:.0%}"] = value
+        return row
+
+
+def profile_chunks(chunks):
+    """One row of statistics per column over every chunk, in a single pass."""
+    profiles = {}
+    for chunk in chunks:
+        for col in chunk.columns:
+            profiles.setdefault(col, ColumnProfile()).update(chunk[col])
+    return pd.DataFrame({col: profile.row() for col, profile in profiles.items()}).T
+
+
+def load_profile(path=DATA_PATH, chunksize=CHUNKSIZE):
+    """Return (profile, hit) for a csv, computed once per file version."""
+    key = fingerprint(path)
+    return _profiles.get(key, lambda: profile_chunks(read_chunks(key[0], chunksize)))
+
+
+def describe(profile):
+    """The numeric part of a profile laid out like df.describe()."""
+    numeric = profile[profile["mean"].notna()]
+    stats = ["non-null", "mean", "std", "min"] + [f"{q:.0%}" for q in QUANTILES] + ["max"]
+    return numeric[stats].rename(columns={"non-null": "count"}).T.astype("float64")
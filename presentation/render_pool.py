@@ -0,0 +1,62 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import streamlit as st
+
+from figure_cache import figure_bytes, figure_key, get_figure, put_figure
+
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """The render workers, started on first use from a forkserver, see parallel._get_pool()."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS, mp_context=multiprocessing.get_context("forkserver"))
+    return _pool
+
+
+def _render(build, args, fmt):
+    """Worker entry point: build the figure and return its bytes."""
+    return figure_bytes(build(*args), fmt)
+
+
+class FigureScheduler:
+    """Charts of one page rendered in worker processes and shown as each one finishes.
+
+    matplotlib holds the GIL while drawing, so charts only render side by
+    side in separate processes. submit() reserves the chart's place on the
+    page and, on a figure cache miss, sends a module-level builder (see
+    charts.py) and its inputs to a worker; drain() fills the places in
+    completion order and caches the bytes in this process.
+    """
+
+    def __init__(self, view, data_key, fmt="png"):
+        self.view = view
+        self.data_key = data_key
+        self.fmt = fmt
+        self._slots = {}
+
+    def submit(self, chart, build, *args, **params):
+        """Show build(*args); `params` tell apart charts drawn from the same data_key."""
+        slot = st.empty()
+        key = figure_key(self.view, chart, self.data_key, params, self.fmt)
+        data = get_figure(key)
+        if data is not None:
+            slot.image(data)
+            return
+        future = _get_pool().submit(_render, build, args, self.fmt)
+        self._slots[future] = slot, key
+
+    def drain(self):
+        for future in as_completed(self._slots):
+            slot, key = self._slots.pop(future)
+            data = future.result()
+            put_figure(key, data)
+            slot.image(data)
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+DATE_FORMAT = "%m/%d/%Y"
+
+CATEGORY_COLUMNS = ["Month", "Customer Gender", "Country", "State",
+                    "Product Category", "Sub Category"]
+
+NUMERIC_COLUMNS = ["index", "Year", "Customer Age", "Quantity", "Unit Cost",
+                   "Unit Price", "Cost", "Revenue", "Column1"]
+
+# every numeric column can hold the odd empty cell, so they are read as float
+# and narrowed afterwards by downcast()
+SALES_DTYPES = {"Date": "str"}
+SALES_DTYPES.update({col: "category" for col in CATEGORY_COLUMNS})
+SALES_DTYPES.update({col: "float64" for col in NUMERIC_COLUMNS})
+
+ENGINES = ["c", "pyarrow"]
+
+
+def downcast(df):
+    """Narrow numeric columns in place of the originals, never losing a value."""
+    df = df.copy(deep=False)
+    for col in df.select_dtypes(include="number").columns:
+        values = df[col]
+        if values.isna().any():
+            as_float = values.astype("float32")
+            if np.array_equal(as_float.to_numpy(), values.to_numpy(), equal_nan=True):
+                df[col] = as_float
+        elif (values % 1 == 0).all():
+            df[col] = pd.to_numeric(values.astype("int64"), downcast="integer")
+        else:
+            df[col] = pd.to_numeric(values, downcast="float")
+            if not np.array_equal(df[col].to_numpy(), values.to_numpy()):
+                df[col] = values
+    return df
+
+
+def read_sales_csv(path, engine="c"):
+    """Read a sales csv with the declared schema instead of dtype inference."""
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
+    df = pd.read_csv(path, dtype=SALES_DTYPES, engine=engine)
+    df["Date"] = pd.to_datetime(df["Date"], format=DATE_FORMAT)
+    return downcast(df)
+
+
+def memory_usage(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def memory_report(path, engine="c"):
+    """Per-column bytes with inferred dtypes vs. the declared schema."""
+    inferred = pd.read_csv(path).memory_usage(index=True, deep=True)
+    typed = read_sales_csv(path, engine).memory_usage(index=True, deep=True)
+    report = pd.DataFrame({"inferred": inferred, "typed": typed})
+    report.loc["total"] = report.sum()
+    report["saved %"] = (100 * (1 - report["typed"] / report["inferred"])).round(1)
+    return report
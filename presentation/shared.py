@@ -0,0 +1,116 @@
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from atomic import atomic_write
+from columnar import ColumnStore
+
+# directory the dataset server publishes into; empty means every process loads its own copy
+SHARED_DIR = os.environ.get("SALES_SHARED_DIR", "")
+
+POINTER = "current.json"
+
+
+def _key_tag(key):
+    return json.dumps(key)
+
+
+def current_version(root=SHARED_DIR):
+    """The pointer to the published version, or None when nothing is published."""
+    try:
+        with open(os.path.join(root, POINTER)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def publish(table, key, root=SHARED_DIR):
+    """Write a ColumnStore as memory-mappable .npy files and make it current.
+
+    Every version goes into its own directory, and the pointer file is
+    replaced in one rename, so readers see either the old or the new version,
+    never a mix. Older versions are removed; processes that still map them
+    keep their pages until they let go.
+    """
+    os.makedirs(root, exist_ok=True)
+    version = f"v-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    tmp = os.path.join(root, version + ".tmp")
+    os.makedirs(tmp)
+    columns = []
+    for i, col in enumerate(table.columns):
+        if col in table.codes:
+            np.save(os.path.join(tmp, f"{i}.npy"), table.codes[col])
+            dtype = table.dictionaries[col]
+            columns.append({"name": col, "categories": dtype.categories.tolist(), "ordered": dtype.ordered})
+        else:
+            np.save(os.path.join(tmp, f"{i}.npy"), table.arrays[col])
+            columns.append({"name": col})
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump({"key": _key_tag(key), "columns": columns}, f)
+    os.replace(tmp, os.path.join(root, version))
+
+    pointer = {"version": version, "key": _key_tag(key)}
+    atomic_write(os.path.join(root, POINTER), lambda f: json.dump(pointer, f), mode="w")
+
+    # other publishers' unfinished versions end in .tmp and are left alone
+    for name in os.listdir(root):
+        if name.startswith("v-") and not name.endswith(".tmp") and name != version:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return version
+
+
+def attach(key, root=SHARED_DIR):
+    """The published ColumnStore for dataset version `key`, memory-mapped, or None.
+
+    None when nothing is published, the published data belongs to another
+    version, or the version was swapped out while attaching.
+    """
+    pointer = current_version(root)
+    if pointer is None or pointer["key"] != _key_tag(key):
+        return None
+    directory = os.path.join(root, pointer["version"])
+    try:
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        codes, dictionaries, arrays = {}, {}, {}
+        for i, column in enumerate(meta["columns"]):
+            array = np.load(os.path.join(directory, f"{i}.npy"), mmap_mode="r")
+            if "categories" in column:
+                dictionaries[column["name"]] = pd.CategoricalDtype(column["categories"], column["ordered"])
+                codes[column["name"]] = array
+            else:
+                arrays[column["name"]] = array
+    except FileNotFoundError:
+        return None
+    return ColumnStore([column["name"] for column in meta["columns"]], codes, dictionaries, arrays)
+
+
+def serve(root, interval=None):
+    """Load and clean the data once, publish it, and republish whenever it changes."""
+    from store import dataset_key, load_clean
+
+    published = None
+    while True:
+        key = dataset_key()
+        if key != published:
+            df, _ = load_clean()
+            version = publish(ColumnStore.from_frame(df), key, root)
+            print("published", version, flush=True)
+            published = key
+        if interval is None:
+            return
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    # python shared.py [DIR [SECONDS]]: publish into DIR, then re-check every SECONDS
+    root = sys.argv[1] if len(sys.argv) > 1 else SHARED_DIR
+    if not root:
+        sys.exit("usage: shared.py DIR [SECONDS] (or set SALES_SHARED_DIR)")
+    serve(root, float(sys.argv[2]) if len(sys.argv) > 2 else None)
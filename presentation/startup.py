@@ -0,0 +1,16 @@
+import importlib
+import sys
+import time
+
+# seconds spent on the first import of each view module in this process
+IMPORT_TIMES = {}
+
+
+def import_view(name):
+    """Import a view module on first use and remember how long it took."""
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMES[name] = time.perf_counter() - start
+    return module
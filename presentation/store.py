@@ -0,0 +1,200 @@
+import glob
+import json
+import os
+
+from atomic import atomic_write
+from cleaning import clean_sales
+from columnar import ColumnStore
+from loader import DATA_PATH, fingerprint, load_sales
+from shared import SHARED_DIR, attach
+from versioned import VersionCache
+
+CLEAN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sales_clean.feather")
+
+# appended batches live next to the materialized table as numbered segments
+SEGMENT_SUFFIX = ".append-{:06d}.feather"
+
+_tables = VersionCache()
+
+
+def _source_key(source):
+    path, mtime, size = fingerprint(source)
+    return {"path": path, "mtime": mtime, "size": size}
+
+
+def write_feather(table, path):
+    """Write an uncompressed feather file, see atomic.atomic_write()."""
+    import pyarrow.feather as feather
+
+    atomic_write(path, lambda f: feather.write_feather(table, f, compression="uncompressed"))
+
+
+def materialize(source=DATA_PATH, target=CLEAN_PATH):
+    """Run the cleaning pipeline once and write it as an uncompressed feather file.
+
+    Uncompressed Arrow IPC can be memory-mapped on open, and categories and
+    parsed dates survive the round trip. The source csv fingerprint is kept in
+    the file metadata so readers know when it is stale.
+    """
+    import pyarrow as pa
+
+    raw, _ = load_sales(source)
+    table = pa.Table.from_pandas(clean_sales(raw), preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b"source"] = json.dumps(_source_key(source)).encode()
+    table = table.replace_schema_metadata(metadata)
+    write_feather(table, target)
+    return target
+
+
+def _stored_source(target):
+    import pyarrow as pa
+
+    with pa.memory_map(target) as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    if b"source" not in metadata:
+        return None
+    return json.loads(metadata[b"source"])
+
+
+def ensure_materialized(source=DATA_PATH, target=CLEAN_PATH):
+    """Materialize the table unless the file on disk was built from the current csv.
+
+    Only the file's schema metadata is read, so this is cheap when nothing changed.
+    """
+    if not os.path.exists(target) or _stored_source(target) != _source_key(source):
+        materialize(source, target)
+    return target
+
+
+def segments(target=CLEAN_PATH):
+    """Appended segment files of a materialized table, oldest first."""
+    stem = target[: -len(".feather")]
+    # exactly the numbered files; the data saved next to them has longer names
+    return sorted(glob.glob(glob.escape(stem) + ".append-" + "[0-9]" * 6 + ".feather"))
+
+
+def dataset_key(source=DATA_PATH, target=CLEAN_PATH):
+    """Version of the cleaned table: the source csv plus every appended segment.
+
+    Caches of anything derived from load_clean() should key on this rather
+    than on the csv alone, so an append invalidates them.
+    """
+    return fingerprint(source), tuple(os.path.basename(path) for path in segments(target))
+
+
+def files_since(entries, key, source=DATA_PATH, target=CLEAN_PATH):
+    """What to fold together to get a per-file derived value for dataset version `key`.
+
+    Returns (value, [(path, file key), ...]). When the cached (key, value)
+    `entries` hold the value for an older version of the same csv, that
+    value comes back with only the segments appended since; otherwise value
+    is None and the list starts with the base table, re-materialized first if the csv changed. Data saved
+    next to a file (fingerprints, cube, KPI totals) is stamped with its file
+    key: the csv fingerprint for the base table, the file name for a segment.
+    """
+    csv, names = key
+    for (cached_csv, cached_names), value in entries:
+        if cached_csv == csv and names[: len(cached_names)] == cached_names:
+            break
+    else:
+        value, cached_names = None, ()
+    directory = os.path.dirname(target)
+    files = [(os.path.join(directory, name), name) for name in names[len(cached_names):]]
+    if value is None:
+        files.insert(0, (ensure_materialized(source, target), list(csv)))
+    return value, files
+
+
+def _claim_segment(target):
+    """Reserve the next segment number; returns (segment path, claim file).
+
+    The claim is created with O_EXCL, so of two processes appending at the
+    same time only one gets a number and the other moves on to the next.
+    A claim is held until its segment is in place, so holding the claim of
+    a number whose segment does not exist yet means nobody else writes it.
+    """
+    stem = target[: -len(".feather")]
+    prefix = stem + ".append-"
+    while True:
+        taken = [int(path[len(prefix):][:6]) for path in glob.glob(glob.escape(prefix) + "[0-9]" * 6 + ".*")]
+        path = stem + SEGMENT_SUFFIX.format(max(taken, default=0) + 1)
+        claim = path[: -len(".feather")] + ".claim"
+        try:
+            os.close(os.open(claim, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            continue
+        # claims go away once their segment is written; a stale scan can reach a finished one
+        if os.path.exists(path):
+            os.remove(claim)
+            continue
+        return path, claim
+
+
+def write_segment(df, target=CLEAN_PATH):
+    """Store a cleaned batch as the next segment and return its path."""
+    import pyarrow as pa
+
+    path, claim = _claim_segment(target)
+    try:
+        write_feather(pa.Table.from_pandas(df, preserve_index=False), path)
+    finally:
+        os.remove(claim)
+    return path
+
+
+def read_table(path):
+    """Memory-map one feather file (the base table or a single segment)."""
+    import pyarrow as pa
+
+    return pa.ipc.open_file(pa.memory_map(path)).read_all().to_pandas(split_blocks=True)
+
+
+def _open(target):
+    import pyarrow as pa
+
+    tables = [pa.ipc.open_file(pa.memory_map(path)).read_all()
+              for path in [target] + segments(target)]
+    if len(tables) == 1:
+        return tables[0].to_pandas(split_blocks=True)
+    table = pa.concat_tables(tables, promote_options="permissive").unify_dictionaries()
+    df = table.to_pandas(split_blocks=True)
+    # segments can reach back in time; the table is kept sorted by Date (see dateindex)
+    if not df["Date"].is_monotonic_increasing:
+        df = df.sort_values("Date", kind="stable").reset_index(drop=True)
+    return df
+
+
+def load_clean(source=DATA_PATH, target=CLEAN_PATH):
+    """Return (df, hit) for the cleaned sales table.
+
+    Opens the materialized file (rebuilding it first if the csv changed) with
+    any appended segments and keeps it as a read-only ColumnStore for the
+    rest of the process; every caller gets its own view of the same arrays.
+    With SALES_SHARED_DIR set, a version published by the dataset server is
+    mapped instead. Without pyarrow the cleaning runs in memory.
+    """
+    key = dataset_key(source, target)
+    attached = False
+
+    def build():
+        nonlocal attached
+        if SHARED_DIR:
+            # published by the dataset server (shared.py): mapped, not parsed
+            table = attach(key)
+            if table is not None:
+                attached = True
+                return table
+        try:
+            df = _open(ensure_materialized(source, target))
+        except ImportError:
+            raw, _ = load_sales(source)
+            df = clean_sales(raw)
+        return ColumnStore.from_frame(df)
+
+    table, hit = _tables.get(key, build)
+    return table.frame(), hit or attached
+
+
+if __name__ == "__main__":
+    print("materialized", materialize())
@@ -0,0 +1,84 @@
+import pandas as pd
+
+from cleaning import clean_sales
+from dedup import HashIndex, row_hashes
+from schema import DATE_FORMAT, SALES_DTYPES
+
+GROUP_COLUMNS = ["Country", "State", "Product Category", "Sub Category"]
+MEASURES = ["Quantity", "profit"]
+
+CHUNKSIZE = 100_000
+
+
+def read_chunks(path, chunksize=CHUNKSIZE):
+    """Yield the raw csv in frames of at most chunksize rows."""
+    # the pyarrow engine cannot stream, so chunked reads always use the c parser
+    with pd.read_csv(path, dtype=SALES_DTYPES, chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk["Date"] = pd.to_datetime(chunk["Date"], format=DATE_FORMAT)
+            yield chunk
+
+
+def clean_chunks(chunks):
+    """Run the cleaning steps chunk by chunk, each raw row kept once.
+
+    A row is a duplicate when every raw field matches an earlier row, the
+    rule cleaning.dedupe applies to the whole table, so the chunks add up to
+    load_clean(). Fingerprints of the rows already seen stay in a HashIndex:
+    8 bytes per distinct row, so memory grows with the file (about 80 MB per
+    10 million rows) while the rows themselves are held one chunk at a time.
+    """
+    seen = HashIndex()
+    for chunk in chunks:
+        hashes = row_hashes(chunk)
+        new = ~seen.contains(hashes) & ~pd.Series(hashes).duplicated().to_numpy()
+        seen.add(hashes[new])
+        chunk = clean_sales(chunk[new])
+        if len(chunk):
+            yield chunk
+
+
+class PartialAggregates:
+    """Sums of Quantity and profit per group column plus row counts per Month.
+
+    Two partials built from different chunks (or files) can be merged, and the
+    size only depends on how many distinct groups there are.
+    """
+
+    def __init__(self):
+        self.sums = {col: pd.DataFrame(columns=MEASURES, dtype="float64") for col in GROUP_COLUMNS}
+        self.month_counts = pd.Series(dtype="int64")
+        self.rows = 0
+
+    def update(self, chunk):
+        for col in GROUP_COLUMNS:
+            part = chunk.groupby(col, observed=True)[MEASURES].sum().astype("float64")
+            part.index = part.index.astype(str)
+            self.sums[col] = self.sums[col].add(part, fill_value=0)
+        counts = chunk["Month"].astype(str).value_counts()
+        self.month_counts = self.month_counts.add(counts, fill_value=0).astype("int64")
+        self.rows += len(chunk)
+        return self
+
+    def merge(self, other):
+        merged = PartialAggregates()
+        for col in GROUP_COLUMNS:
+            merged.sums[col] = self.sums[col].add(other.sums[col], fill_value=0)
+        merged.month_counts = self.month_counts.add(other.month_counts, fill_value=0).astype("int64")
+        merged.rows = self.rows + other.rows
+        return merged
+
+    def total(self, col, measure):
+        """e.g. total("Country", "Quantity"), sorted like the dashboard charts."""
+        return self.sums[col][measure].sort_values(ascending=False)
+
+
+def aggregate_csv(path, chunksize=CHUNKSIZE):
+    """Fold a csv of any size into PartialAggregates, one chunk of rows in memory at a time.
+
+    The duplicate check adds 8 bytes per distinct row, see clean_chunks().
+    """
+    aggregates = PartialAggregates()
+    for chunk in clean_chunks(read_chunks(path, chunksize)):
+        aggregates.update(chunk)
+    return aggregates
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from loader import DATA_PATH
+from store import dataset_key, load_clean
+from versioned import VersionCache
+
+GRAINS = {"day": "D", "week": "W", "month": "MS"}
+STATS = ["sum", "mean", "count"]
+
+# one version per (column, grain)
+_series = VersionCache(slot=lambda key: key[1:])
+
+
+def resample(df, column, grain="day", date_column="Date"):
+    """Sum, mean and count of `column` per time bucket, one row per bucket."""
+    if grain not in GRAINS:
+        raise ValueError(f"grain must be one of {list(GRAINS)}, got {grain!r}")
+    grouper = pd.Grouper(key=date_column, freq=GRAINS[grain])
+    return df.groupby(grouper)[column].agg(STATS)
+
+
+def load_series(column, grain="day", source=DATA_PATH):
+    """resample() of the cleaned table, kept per (dataset version, column, grain)."""
+    series, _ = _series.get((dataset_key(source), column, grain),
+                            lambda: resample(load_clean(source)[0], column, grain))
+    return series
@@ -0,0 +1,39 @@
+import threading
+
+
+class VersionCache:
+    """Values derived from one version of the data, shared by every session of the process.
+
+    get(key, build) calls build() only for a key it does not hold yet and
+    returns (value, hit). Storing a value drops the entries it supersedes:
+    every other entry, or with `slot` only those in the same slot, e.g.
+    slot=lambda key: key[0] keeps one version per csv path.
+    """
+
+    def __init__(self, slot=None):
+        self._slot = slot
+        self._items = {}
+        # build() may look at items() to extend an older version
+        self._lock = threading.RLock()
+
+    def get(self, key, build):
+        with self._lock:
+            if key in self._items:
+                return self._items[key], True
+            value = build()
+            if self._slot is None:
+                self._items.clear()
+            else:
+                slot = self._slot(key)
+                for old in [k for k in self._items if self._slot(k) == slot]:
+                    del self._items[old]
+            self._items[key] = value
+            return value, False
+
+    def items(self):
+        with self._lock:
+            return list(self._items.items())
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
@@ -1,21 +1,75 @@
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import datetime as dt
-from sklearn.preprocessing import OneHotEncoder,LabelEncoder, OrdinalEncoder
 import streamlit as st 
-import io
+
+import charts
+from aggregations import breakdown, grouped_slices
+from cube import filtered_cube, load_cube, rollup
+from dateindex import load_date_index, rows
+from downsample import downsample, reduction_note
+from facets import split_panels
+from filters import VALUE_COLUMNS, load_filter_index, selection_key
+from render_pool import FigureScheduler
+from store import dataset_key, load_clean
+from timeseries import GRAINS, load_series, resample
+
+MONTH_TREND_OBSERVATIONS = {
+    2015: "🟢 **Observation:** Some months have strong mid-month spikes, while others peak at the end, indicating varied shopping behaviors.",
+    2016: "🟢 **Observation:** 2016 shows more stable revenue patterns per month, with less variability than 2015.",
+}
+
+
+def sidebar_filters(index, date_index):
+    """Filter widgets in the sidebar.
+
+    Returns (selection for FilterIndex.select(), inclusive (first, last) dates).
+    """
+    st.sidebar.markdown("### 🔎 Filters")
+    selection = {col: st.sidebar.multiselect(col, index.options(col)) for col in VALUE_COLUMNS}
+    low, high = index.bounds("Customer Age")
+    selection["Customer Age"] = st.sidebar.slider("Customer Age", int(low), int(high), (int(low), int(high)))
+    first, last = (pd.Timestamp(bound).date() for bound in date_index.bounds())
+    dates = st.sidebar.date_input("Date", (first, last), min_value=first, max_value=last)
+    # while a range is being picked the widget holds only its start
+    if len(dates) != 2:
+        dates = (first, last)
+    return selection, tuple(pd.Timestamp(day) for day in dates)
+
 
 def show():
-    df=pd.read_csv("sales_for_course.csv")  
+    df, hit = load_clean()
+    index, _ = load_filter_index()
+    date_index, _ = load_date_index()
+    selection, dates = sidebar_filters(index, date_index)
+    # the table is sorted by Date, so the date range is a slice, not a mask
+    start, stop = date_index.between(*dates)
+    mask = index.select(selection)
+    if mask is not None or (start, stop) != (0, len(df)):
+        df = rows(df, (start, stop))
+        if mask is not None:
+            df = df[mask[start:stop]]
+    filtered = len(df) < len(date_index)
+
+    data_key = (dataset_key(), selection_key(selection), dates)
+    scheduler = FigureScheduler("visualization", data_key)
+
+    def load_view_cube():
+        # only the branches charting the cube pay for it
+        return filtered_cube(data_key, df) if filtered else load_cube()[0]
+
+    def series(column, grain):
+        return resample(df, column, grain) if filtered else load_series(column, grain)
+
     st.header("pre_processing")
+    st.caption("dataset served from cache" if hit else "dataset parsed from csv")
+    if filtered:
+        st.caption(f"{len(df):,} of {index.n:,} rows match the filters")
+    if not len(df):
+        st.warning("No rows match the selected filters.")
+        return
     analysis_type = st.selectbox(
     "Select Analysis Type",
     ["date","Age","Gender","country","main_category","sub_category","country_product"]
 )
-    df["profit"] = df["Revenue"] - df["Cost"]
-
     if analysis_type=="date":
         
         st.markdown("### ✅ Step 1: Data Preparation")
@@ -24,11 +78,9 @@ def show():
         This will help in performing time-series analysis and understanding trends over time.
         """)
 
-        df["Date"] = pd.to_datetime(df["Date"])
-        df = df.sort_values(by="Date").reset_index(drop=True)
-        df["year"] = df["Date"].dt.year
-        df["month"] = df["Date"].dt.month
-        df["day"] = df["Date"].dt.day
+        grain = st.selectbox("Time grain", list(GRAINS))
+        revenue = series("Revenue", grain)
+        profit = series("profit", grain)
 
         st.markdown("### 📅 Step 2: Monthly Distribution of Sales")
         st.markdown("""
@@ -36,11 +88,9 @@ def show():
         🟢 **Observation:** Most of the sales seem to occur in **January** and **December**, indicating strong seasonal activity — possibly due to holiday promotions or end-of-year offers.
         """)
 
-        fig1, ax1 = plt.subplots()
         month_counts = df["Month"].value_counts()
-        ax1.pie(month_counts, labels=month_counts.index, autopct='%1.1f%%', startangle=90, shadow=True)
-        ax1.axis('equal')
-        st.pyplot(fig1)
+        # categorical counts include months the filters left empty
+        scheduler.submit("month_pie", charts.month_pie, month_counts[month_counts > 0])
 
         st.markdown("### 📈 Step 3: Revenue Over 2015")
         st.markdown("""
@@ -48,13 +98,10 @@ def show():
         🟢 **Observation:** There are fluctuations in revenue, with noticeable spikes — possibly caused by high-volume purchases or promotions during certain periods.
         """)
 
-        df_2015 = df[df["year"] == 2015.0]
-        fig2, ax2 = plt.subplots(figsize=(15, 4))
-        ax2.plot(df_2015["Date"], df_2015["Revenue"])
-        ax2.set_xlabel("Date")
-        ax2.set_ylabel("Revenue")
-        ax2.set_title("Revenue Over 2015")
-        st.pyplot(fig2)
+        revenue_2015 = downsample(revenue.loc["2015":"2015", "sum"])
+        st.caption(reduction_note(revenue.loc["2015":"2015"], revenue_2015))
+
+        scheduler.submit("revenue_2015", charts.revenue_over_year, revenue_2015, 2015, grain=grain)
 
         st.markdown("### 📈 Step 4: Revenue Over 2016")
         st.markdown("""
@@ -62,13 +109,10 @@ def show():
         🟢 **Observation:** Compared to 2015, revenue appears more stable in 2016 with fewer spikes, possibly indicating a more consistent customer base or better inventory control.
         """)
 
-        df_2016 = df[df["year"] == 2016.0]
-        fig3, ax3 = plt.subplots(figsize=(15, 4))
-        ax3.plot(df_2016["Date"], df_2016["Revenue"])
-        ax3.set_xlabel("Date")
-        ax3.set_ylabel("Revenue")
-        ax3.set_title("Revenue Over 2016")
-        st.pyplot(fig3)
+        revenue_2016 = downsample(revenue.loc["2016":"2016", "sum"])
+        st.caption(reduction_note(revenue.loc["2016":"2016"], revenue_2016))
+
+        scheduler.submit("revenue_2016", charts.revenue_over_year, revenue_2016, 2016, grain=grain)
 
         st.markdown("### 💰 Step 5: Profit Over Time")
         st.markdown("""
@@ -77,14 +121,11 @@ def show():
         """)
 
         
-        fig, ax = plt.subplots(figsize=(20, 5))
-        sns.lineplot(data=df, x="Date", y="profit", ax=ax)
-        ax.set_title("Profit Over Time")
-        ax.set_xlabel("Date")
-        ax.set_ylabel("Profit")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        st.pyplot(fig)
+        # mean per bucket, the same estimate sns.lineplot drew from every row
+        profit_mean = downsample(profit["mean"])
+        st.caption(reduction_note(profit, profit_mean))
+
+        scheduler.submit("profit_over_time", charts.profit_over_time, profit_mean, grain=grain)
 
       
         st.markdown("### 📄 Step 6: Sample of Raw Data")
@@ -94,43 +135,16 @@ def show():
         st.dataframe(df.head(10))
         
       
-        st.markdown("### 📅 Revenue Trend in Each Month of 2015")
-        st.markdown("""
-        We analyze the revenue day-by-day for each month in 2015 to spot detailed fluctuations or trends inside months.  
-        🟢 **Observation:** Some months have strong mid-month spikes, while others peak at the end, indicating varied shopping behaviors.
-        """)
-
-        fig5, axes = plt.subplots(4, 3, figsize=(20, 10))
-        axes = axes.flatten()
-
-        for month in range(1, 13):
-            ax = axes[month - 1]
-            x_axis = df_2015[df_2015["month"] == month]
-            sns.lineplot(data=x_axis, x="day", y="Revenue", ax=ax)
-            ax.set_title(f"Revenue in {month}/2015")
-
-        plt.suptitle("Revenue over Months in 2015", fontsize=16, fontweight="bold")
-        plt.tight_layout()
-        st.pyplot(fig5)
-
-        st.markdown("### 📅 Revenue Trend in Each Month of 2016")
-        st.markdown("""
-        We repeat the same day-by-day revenue analysis for the available months in 2016.  
-        🟢 **Observation:** 2016 shows more stable revenue patterns per month, with less variability than 2015.
-        """)
+        month_panels = split_panels(df, ["year", "month"], "day", "Revenue")
+        for year in sorted({year for year, _ in month_panels}):
+            st.markdown(f"### 📅 Revenue Trend in Each Month of {year}")
+            st.markdown(f"""
+            We analyze the revenue day-by-day for each month in {year} to spot detailed fluctuations or trends inside months.  
+            {MONTH_TREND_OBSERVATIONS.get(year, "")}
+            """)
 
-        fig6, axes = plt.subplots(2, 4, figsize=(20, 10))
-        axes = axes.flatten()
-
-        for month in range(1, 8):  
-            ax = axes[month - 1]
-            data = df_2016[df_2016["month"] == month]
-            sns.lineplot(data=data, x="day", y="Revenue", ax=ax)
-            ax.set_title(f"Revenue in {month}/2016")
-
-        plt.suptitle("Revenue over Months in 2016", fontsize=16, fontweight="bold")
-        plt.tight_layout()
-        st.pyplot(fig6)
+            year_panels = {month: series for (panel_year, month), series in month_panels.items() if panel_year == year}
+            scheduler.submit("month_grid", charts.month_grid, year_panels, year, year=year)
 
     elif analysis_type=="Age":
 
@@ -148,9 +162,7 @@ def show():
         """)
 
      
-        fig = sns.pairplot(df, vars=["Customer Age"], height=3)
-        st.pyplot(fig.figure)  
-        plt.tight_layout()
+        scheduler.submit("age_pairplot", charts.age_pairplot, df[["Customer Age"]])
   
         st.markdown("""
         > 🔍 **Observation:**  
@@ -172,17 +184,11 @@ def show():
         """)
 
 
-        gender_count = df["Customer Gender"].value_counts().reset_index()
+        gender_count = df["Customer Gender"].value_counts()
+        gender_count = gender_count[gender_count > 0].reset_index()
         gender_count.columns = ["Customer Gender", "Count"]
 
-
-        fig, ax = plt.subplots()
-        ax.bar(gender_count["Customer Gender"], gender_count["Count"], color=["skyblue", "lightgreen"])
-        ax.set_xlabel("Gender")
-        ax.set_ylabel("Count")
-        ax.set_title("Gender Count")
-        plt.tight_layout()
-        st.pyplot(fig)
+        scheduler.submit("gender_count", charts.gender_count, gender_count)
 
         st.markdown("""
         > 🔍 **Observation:**  
@@ -195,6 +201,7 @@ def show():
     
     elif analysis_type == "country":
 
+        cube = load_view_cube()
         st.title("Sales Analysis by Country and State")
 
         st.markdown("""
@@ -202,68 +209,34 @@ def show():
         This chart shows which countries have the highest number of items sold.
         """)
 
-        sum_quantity_per_country = df.groupby("Country")["Quantity"].sum().sort_values(ascending=False)
-        fig1, ax1 = plt.subplots(figsize=(14, 7))
-        ax1.bar(sum_quantity_per_country.index, sum_quantity_per_country.values, color='skyblue')
-        ax1.set_xlabel("Country")
-        ax1.set_ylabel("Total Quantity")
-        ax1.set_title("Total Quantity of Sales per Country")
-        plt.tight_layout()
-        plt.xticks(rotation=90)
-        st.pyplot(fig1)
+        sum_quantity_per_country = rollup(cube, "Country", "Quantity").sort_values(ascending=False)
+        scheduler.submit("country_quantity", charts.totals_bar, sum_quantity_per_country,
+                      "Country", "Total Quantity", "Total Quantity of Sales per Country")
 
         st.markdown("""
         ### Total Profit by Country
         This chart shows where the most profit is being generated from sales.
         """)
 
-        sum_profit_per_country = df.groupby("Country")["profit"].sum().sort_values(ascending=False)
-        fig2, ax2 = plt.subplots(figsize=(14, 7))
-        ax2.bar(sum_profit_per_country.index, sum_profit_per_country.values, color='skyblue')
-        ax2.set_xlabel("Country")
-        ax2.set_ylabel("Total Profit")
-        ax2.set_title("Total Profit of Sales per Country")
-        plt.xticks(rotation=90)
-        plt.tight_layout()
-        plt.ylim(0, 1000000)
-        st.pyplot(fig2)
+        sum_profit_per_country = rollup(cube, "Country", "profit").sort_values(ascending=False)
+        scheduler.submit("country_profit", charts.totals_bar, sum_profit_per_country,
+                      "Country", "Total Profit", "Total Profit of Sales per Country", ylim=(0, 1000000))
 
         st.markdown("### State-Level Sales Quantity in Top Countries")
 
-        fig3, axes1 = plt.subplots(2, 2, figsize=(20, 10))
-        axes1 = axes1.flatten()
-        countries = ['United States', 'United Kingdom', 'Germany', 'France']
-
-        for idx, country in enumerate(countries):
-            ax = axes1[idx]
-            state_quantity = df[df["Country"] == country].groupby("State")["Quantity"].sum().reset_index()
-            ax.bar(state_quantity["State"], state_quantity["Quantity"], color='mediumseagreen')
-            ax.set_xlabel(f"Sales in {country}")
-            ax.set_ylabel("Total Quantity")
-            ax.set_title(f"Sales Quantity in {country}")
-            ax.tick_params(axis='x', rotation=85)
-            plt.tight_layout()
-            for j, v in enumerate(state_quantity["Quantity"]):
-                ax.text(j, v + 0.1, str(int(v)), ha='center', va='bottom', fontsize=7)
-        st.pyplot(fig3)
+        state_totals = grouped_slices(cube, "Country", "State", ["Quantity", "profit"])
+        countries = [country for country in ['United States', 'United Kingdom', 'Germany', 'France']
+                     if country in state_totals]
+
+        state_quantity = {country: state_totals[country]["Quantity"] for country in countries}
+        scheduler.submit("state_quantity", charts.state_grid, state_quantity, "Quantity", "Total Quantity",
+                      "Sales Quantity in {}", 'mediumseagreen', (20, 10))
 
         st.markdown("### State-Level Profit in Top Countries")
 
-        fig4, axes2 = plt.subplots(2, 2, figsize=(20, 7))
-        axes2 = axes2.flatten()
-
-        for idx, country in enumerate(countries):
-            ax = axes2[idx]
-            state_profit = df[df["Country"] == country].groupby("State")["profit"].sum().reset_index()
-            ax.bar(state_profit["State"], state_profit["profit"], color='salmon')
-            ax.set_xlabel(f"Sales in {country}")
-            ax.set_ylabel("Total Profit")
-            ax.set_title(f"Sales Profit in {country}")
-            ax.tick_params(axis='x', rotation=85)
-            plt.tight_layout()
-            for j, v in enumerate(state_profit["profit"]):
-                ax.text(j, v + 0.1, str(int(v)), ha='center', va='bottom', fontsize=7)
-        st.pyplot(fig4)
+        state_profit = {country: state_totals[country]["profit"] for country in countries}
+        scheduler.submit("state_profit", charts.state_grid, state_profit, "profit", "Total Profit",
+                      "Sales Profit in {}", 'salmon', (20, 7))
 
         st.markdown("""
         > 🔍 **Observation:**  
@@ -272,191 +245,84 @@ def show():
         """)
     elif analysis_type == "main_category":
    
+        cube = load_view_cube()
         st.subheader("Total Quantity by Product Category")
-        sum_quantity_per_subcategory = df.groupby("Product Category")["Quantity"].sum().sort_values(ascending=False)
+        sum_quantity_per_subcategory = rollup(cube, "Product Category", "Quantity").sort_values(ascending=False)
         
-        fig1, ax1 = plt.subplots(figsize=(14, 7))
-        ax1.bar(sum_quantity_per_subcategory.index, sum_quantity_per_subcategory.values, color='skyblue')
-        ax1.set_xlabel("Product Category")
-        ax1.set_ylabel("Total Quantity")
-        ax1.set_title("Total Quantity by Product Category")
-        plt.xticks(rotation=90)
-        plt.tight_layout()  
-        st.pyplot(fig1)
+        scheduler.submit("category_quantity", charts.totals_bar, sum_quantity_per_subcategory,
+                      "Product Category", "Total Quantity", "Total Quantity by Product Category")
 
         st.subheader("Profit Distribution (Percentage)")
 
-        Accessories = df[df["Product Category"] == "Accessories"]["profit"].sum()
-        Bikes = df[df["Product Category"] == "Bikes"]["profit"].sum()
-        Clothing = df[df["Product Category"] == "Clothing"]["profit"].sum()
-        
-        categories = ["Accessories", "Bikes", "Clothing"]
-        profits = [Accessories, Bikes, Clothing]
-        
-        fig2, ax2 = plt.subplots()
-        ax2.pie(profits, labels=categories, autopct='%1.1f%%', startangle=140)
-        ax2.set_title("Total Profit by Product Category")
-        ax2.axis('equal')
-        plt.tight_layout()  
-        st.pyplot(fig2)
+        profit_breakdown = breakdown(cube, "Product Category", "profit")
+        categories = profit_breakdown.index
+        profits = profit_breakdown["total"]
+
+        scheduler.submit("category_profit_share", charts.share_pie, profits, categories, "Total Profit by Product Category")
 
         st.markdown("**Observation:**")
-        st.markdown("- Accessories: **61%**")
-        st.markdown("- Bikes: **14.9%**")
-        st.markdown("- Clothing: **24.1%**")
+        for category, share in profit_breakdown["share"].items():
+            st.markdown(f"- {category}: **{share:.1f}%**")
 
       
         st.subheader("Profit Distribution (Absolute Values)")
 
-        def show_values(pct, all_vals):
-            absolute = int(pct / 100. * sum(all_vals))
-            return f"{absolute}"
-        
-        fig3, ax3 = plt.subplots()
-        ax3.pie(
-            profits,
-            labels=categories,
-            autopct=lambda pct: show_values(pct, profits),
-            startangle=140
-        )
-        ax3.set_title("Total Profit by Product Category (Absolute Values)")
-        ax3.axis('equal')
-        plt.tight_layout() 
-        st.pyplot(fig3)
+        scheduler.submit("category_profit_total", charts.share_pie, profits, categories,
+                      "Total Profit by Product Category (Absolute Values)", profit_breakdown["absolute"])
     elif analysis_type == "sub_category":
        
+        cube = load_view_cube()
         st.subheader("Profit by Sub Category (within each Product Category)")
         
-        profit = df.groupby(["Product Category", "Sub Category"])["profit"].sum().reset_index()
-        fig1, axes1 = plt.subplots(1, 3, figsize=(12, 5))
-        axes1 = axes1.flatten()
+        profit = rollup(cube, ["Product Category", "Sub Category"], "profit").reset_index()
         products = ['Bikes', 'Accessories', 'Clothing']
-        
-        for idx, product in enumerate(products):
-            ax = axes1[idx]
-            profit_product = profit[profit["Product Category"] == product][["Sub Category", "profit"]]
-            ax.bar(profit_product["Sub Category"], profit_product["profit"])
-            ax.set_xlabel(f"{product} Sub Categories")
-            ax.set_ylabel("Profit")
-            ax.set_title(f"Profit in {product}")
-            ax.set_xticks(range(len(profit_product["Sub Category"])))
-            ax.set_xticklabels(profit_product["Sub Category"], rotation=85, fontsize=7)
-            
-
-            for j, v in enumerate(profit_product["profit"]):
-                ax.text(j, v + 1, str(int(v)), ha="center", va="bottom", fontsize=6)
-        
-        plt.tight_layout()
-        st.pyplot(fig1)
+
+        scheduler.submit("subcategory_profit", charts.subcategory_grid, profit, products, "profit")
 
 
         st.subheader("Total Profit by Sub Category")
-        total_profit_by_subcategory = df.groupby("Sub Category")["profit"].sum().reset_index()
-        total_profit_by_subcategory = total_profit_by_subcategory.sort_values(by="profit", ascending=False)
-        
-        fig2, ax2 = plt.subplots(figsize=(12, 6))
-        ax2.bar(total_profit_by_subcategory["Sub Category"], total_profit_by_subcategory["profit"])
-        ax2.set_xlabel("Sub Category")
-        ax2.set_ylabel("Profit")
-        ax2.set_title("Profit by Sub Category")
-        plt.xticks(rotation=85)
-        plt.tight_layout()
-        st.pyplot(fig2)
+        total_profit_by_subcategory = rollup(cube, "Sub Category", "profit").sort_values(ascending=False)
+        scheduler.submit("subcategory_profit_total", charts.totals_bar, total_profit_by_subcategory,
+                      "Sub Category", "Profit", "Profit by Sub Category", figsize=(12, 6), color=None, rotation=85)
 
         st.subheader("Quantity by Sub Category (within each Product Category)")
         
-        quantity = df.groupby(["Product Category", "Sub Category"])["Quantity"].sum().reset_index()
-        fig3, axes3 = plt.subplots(1, 3, figsize=(12, 5))
-        axes3 = axes3.flatten()
-        
-        for idx, product in enumerate(products):
-            ax = axes3[idx]
-            quantity_product = quantity[quantity["Product Category"] == product][["Sub Category", "Quantity"]]
-            ax.bar(quantity_product["Sub Category"], quantity_product["Quantity"])
-            ax.set_xlabel(f"{product} Sub Categories")
-            ax.set_ylabel("Quantity")
-            ax.set_title(f"Quantity in {product}")
-            ax.set_xticks(range(len(quantity_product["Sub Category"])))
-            ax.set_xticklabels(quantity_product["Sub Category"], rotation=85, fontsize=7)
-            
-            for j, v in enumerate(quantity_product["Quantity"]):
-                ax.text(j, v + 1, str(int(v)), ha="center", va="bottom", fontsize=6)
-        
-        plt.tight_layout()
-        st.pyplot(fig3)
+        quantity = rollup(cube, ["Product Category", "Sub Category"], "Quantity").reset_index()
+        scheduler.submit("subcategory_quantity", charts.subcategory_grid, quantity, products, "Quantity")
 
 
         st.subheader("Total Quantity by Sub Category")
-        sum_quantity_per_subcategory = df.groupby("Sub Category")["Quantity"].sum().sort_values(ascending=False)
+        sum_quantity_per_subcategory = rollup(cube, "Sub Category", "Quantity").sort_values(ascending=False)
         
-        fig4, ax4 = plt.subplots(figsize=(14, 7))
-        ax4.bar(sum_quantity_per_subcategory.index, sum_quantity_per_subcategory.values, color='skyblue')
-        ax4.set_xlabel("Sub Category")
-        ax4.set_ylabel("Total Quantity")
-        ax4.set_title("Total Quantity by Sub Category")
-        plt.xticks(rotation=90)
-        plt.tight_layout()
-        st.pyplot(fig4)
+        scheduler.submit("subcategory_quantity_total", charts.totals_bar, sum_quantity_per_subcategory,
+                      "Sub Category", "Total Quantity", "Total Quantity by Sub Category")
     elif analysis_type == "country_product":
        
+        cube = load_view_cube()
         st.subheader("Top Product Categories per Country")
         
 
-        country_main = df[["Country", "Product Category"]].value_counts().reset_index(name="count")
+        country_main = rollup(cube, ["Country", "Product Category"], "count").sort_values(ascending=False).reset_index()
         
-        fig1, ax1 = plt.subplots(figsize=(14, 6))
-        sns.barplot(
-            data=country_main,
-            x='Country',
-            y='count',
-            hue='Product Category',
-            ax=ax1
-        )
-        ax1.set_title('Top Product Categories by Country')
-        ax1.set_xlabel('Country')
-        ax1.set_ylabel('Number of Purchases')
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        st.pyplot(fig1)
+        scheduler.submit("country_categories", charts.purchase_counts, country_main, 'Country', 'Product Category',
+                      'Top Product Categories by Country', (14, 6), 45)
 
         st.subheader("Top Sub Categories per Country")
-        country_sub = df[["Country", "Sub Category"]].value_counts().reset_index(name="count")
+        country_sub = rollup(cube, ["Country", "Sub Category"], "count").sort_values(ascending=False).reset_index()
         
-        fig2, ax2 = plt.subplots(figsize=(14, 6))
-        sns.barplot(
-            data=country_sub,
-            x='Country',
-            y='count',
-            hue='Sub Category',
-            ax=ax2
-        )
-        ax2.set_title('Top Sub Categories by Country')
-        ax2.set_xlabel('Country')
-        ax2.set_ylabel('Number of Purchases')
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        st.pyplot(fig2)
+        scheduler.submit("country_subcategories", charts.purchase_counts, country_sub, 'Country', 'Sub Category',
+                      'Top Sub Categories by Country', (14, 6), 45)
 
 
         st.subheader("Top Product Categories per State")
-        state_main = df[["State", "Product Category"]].value_counts().reset_index(name="count")
+        state_main = rollup(cube, ["State", "Product Category"], "count").sort_values(ascending=False).reset_index()
         
-        fig3, ax3 = plt.subplots(figsize=(14, 8))
-        sns.barplot(
-            data=state_main,
-            x='State',
-            y='count',
-            hue='Product Category',
-            ax=ax3
-        )
-        ax3.set_title('Top Product Categories by State')
-        ax3.set_xlabel('State')
-        ax3.set_ylabel('Number of Purchases')
-        plt.xticks(rotation=90)
-        plt.tight_layout()
-        st.pyplot(fig3)
+        scheduler.submit("state_categories", charts.purchase_counts, state_main, 'State', 'Product Category',
+                      'Top Product Categories by State', (14, 8), 90)
 
      
         st.markdown("---")
         st.markdown("### 🧡 After all, you should know that:")
-        st.markdown("**BY: OMAR SHOHIEB** 🎯")
\ No newline at end of file
+        st.markdown("**BY: OMAR SHOHIEB** 🎯")
+
+    scheduler.drain()